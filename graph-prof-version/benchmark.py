@@ -0,0 +1,159 @@
+"""Benchmark the GraphADT backends on synthetic graphs.
+
+Every backend is built from the same generated edge list and each ADT
+operation is timed on it; the results are printed as a table and can be
+written as JSON and/or CSV to compare backends or track regressions:
+
+    python benchmark.py --sizes 100 1000 10000 --densities 0.001 0.01 --json out.json --csv out.csv
+"""
+import argparse
+import csv
+import json
+import random
+import tracemalloc
+from math import isqrt
+from time import perf_counter
+
+from graph_generators import barabasi_albert, gnm, grid_2d, watts_strogatz
+from main import (AdjacencyListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph, CompactEdgeListGraph,
+                  DenseMatrixGraph, EdgeListGraph, Vertex)
+
+BACKENDS = {
+    'edge_list': EdgeListGraph,
+    'adjacency_list': AdjacencyListGraph,
+    'adjacency_map': AdjacencyMapGraph,
+    'adjacency_matrix': AdjacencyMatrixGraph,
+    'dense_matrix': DenseMatrixGraph,
+    'compact_edge_list': CompactEdgeListGraph,
+}
+
+FIELDS = ('generator', 'vertices', 'density', 'edges', 'backend', 'operation', 'ops', 'seconds',
+          'ops_per_second', 'peak_memory_bytes')
+
+
+def erdos_renyi(n, density, rng):
+    """G(n, m) with m = density * n * (n - 1) / 2 distinct random pairs."""
+    return list(gnm(n, int(density * n * (n - 1) / 2), rng))
+
+
+def power_law(n, density, rng):
+    """Barabási–Albert graph whose average degree matches density."""
+    return list(barabasi_albert(n, min(n - 1, max(1, round(density * (n - 1) / 2))), rng)) if n > 1 else []
+
+
+def small_world(n, density, rng):
+    """Watts–Strogatz ring with about density * (n - 1) neighbours per vertex, 10% rewired."""
+    return list(watts_strogatz(n, min(n - 1, max(2, round(density * (n - 1)))), 0.1, rng)) if n > 2 else []
+
+
+def grid(n, density, rng):
+    """2-D grid on the largest square not above n vertices; density is ignored."""
+    side = isqrt(n)
+    return list(grid_2d(side, side))
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'power_law': power_law,
+    'small_world': small_world,
+    'grid': grid,
+}
+
+
+def _build(backend, vertices, pairs):
+    graph = backend(directed=False)
+    for v in vertices:
+        graph.insert_vertex(v)
+    for i, j in pairs:
+        graph.insert_edge(vertices[i], vertices[j], 1.0)
+    return graph
+
+
+def _single(edge):
+    return edge[0] if isinstance(edge, list) else edge  # EdgeListGraph.get_edge returns a list
+
+
+def bench_backend(backend, n, pairs, queries, rng):
+    """Time every ADT operation of backend on the graph given by pairs and
+    return a dict mapping operation names to (ops, seconds), plus the peak
+    traced memory of building the graph."""
+    vertices = [Vertex(i) for i in range(n)]
+    timings = {}
+
+    def timed(operation, ops, function):
+        start = perf_counter()
+        function()
+        timings[operation] = (ops, perf_counter() - start)
+
+    tracemalloc.start()
+    _build(backend, vertices, pairs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    graph = backend(directed=False)
+    timed('insert_vertex', n, lambda: [graph.insert_vertex(v) for v in vertices])
+    timed('insert_edge', len(pairs), lambda: [graph.insert_edge(vertices[i], vertices[j], 1.0) for i, j in pairs])
+
+    sample = [rng.choice(pairs) for _ in range(queries)] if pairs else []
+    probes = [vertices[rng.randrange(n)] for _ in range(queries)]
+    timed('get_edge', len(sample), lambda: [graph.get_edge(vertices[i], vertices[j]) for i, j in sample])
+    timed('degree', len(probes), lambda: [graph.degree(v) for v in probes])
+    timed('incident_edges', len(probes), lambda: [list(graph.incident_edges(v)) for v in probes])
+    timed('edges', 1, lambda: list(graph.edges()))
+
+    doomed = list(dict.fromkeys(sample))
+    timed('remove_edge', len(doomed), lambda: [graph.remove_edge(_single(graph.get_edge(vertices[i], vertices[j])))
+                                               for i, j in doomed])
+    removed = list(dict.fromkeys(probes))
+    timed('remove_vertex', len(removed), lambda: [graph.remove_vertex(v) for v in removed])
+    return timings, peak
+
+
+def run_benchmarks(sizes, densities, generators=tuple(GENERATORS), backends=tuple(BACKENDS), queries=1000, seed=0):
+    """Return one result row (a dict with the FIELDS keys) per generator,
+    size, density, backend and operation."""
+    rows = []
+    for generator in generators:
+        for n in sizes:
+            for density in densities:
+                pairs = GENERATORS[generator](n, density, random.Random(seed))
+                for name in backends:
+                    timings, peak = bench_backend(BACKENDS[name], n, pairs, queries, random.Random(seed))
+                    for operation, (ops, seconds) in timings.items():
+                        rows.append({
+                            'generator': generator, 'vertices': n, 'density': density, 'edges': len(pairs),
+                            'backend': name, 'operation': operation, 'ops': ops, 'seconds': seconds,
+                            'ops_per_second': ops / seconds if seconds else float('inf'),
+                            'peak_memory_bytes': peak,
+                        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--densities', type=float, nargs='+', default=[0.01, 0.05])
+    parser.add_argument('--generators', nargs='+', choices=GENERATORS, default=list(GENERATORS))
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--queries', type=int, default=1000, help="lookups timed per query operation")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the result rows to this JSON file")
+    parser.add_argument('--csv', help="write the result rows to this CSV file")
+    args = parser.parse_args()
+
+    rows = run_benchmarks(args.sizes, args.densities, args.generators, args.backends, args.queries, args.seed)
+    for row in rows:
+        print(f"{row['generator']:>12} n={row['vertices']:<7} m={row['edges']:<9} {row['backend']:>18} "
+              f"{row['operation']:>15} {row['ops_per_second']:>14.0f} ops/s {row['peak_memory_bytes'] / 2**20:>9.2f} MiB")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(rows, file, indent=2)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as file:
+            writer = csv.DictWriter(file, FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,424 @@
+from array import array
+from collections import deque
+from heapq import heappop, heappush
+from itertools import repeat
+from math import inf
+
+from main import AdjacencyMapGraph, CSRGraph, GraphADT, Vertex, _transpose
+
+
+class SearchResult:
+    """Result of a traversal or shortest-path search, stored as flat arrays.
+
+    The vertex with integer id i is vertices[i]; parent[i] is the id of its
+    predecessor (-1 for the source and for unreached vertices), distance[i]
+    is its hop count or path weight (inf when unreached) and order lists the
+    ids of the reached vertices in the order they were settled."""
+    __slots__ = 'vertices', 'index', 'parent', 'distance', 'order'
+
+    def __init__(self, vertices, index, parent=None, distance=None, order=None):
+        self.vertices = vertices
+        self.index = index
+        self.parent = parent if parent is not None else array('q', [-1]) * len(vertices)
+        self.distance = distance if distance is not None else array('d', [inf]) * len(vertices)
+        self.order = order if order is not None else array('q')
+
+    def reached(self, vertex):
+        return self.distance[self.index[vertex]] != inf
+
+    def distance_to(self, vertex):
+        return self.distance[self.index[vertex]]
+
+    def parent_of(self, vertex):
+        p = self.parent[self.index[vertex]]
+        return self.vertices[p] if p >= 0 else None
+
+    def path_to(self, vertex):
+        """Return the list of vertices from the source to vertex, or None if unreached."""
+        i = self.index[vertex]
+        if self.distance[i] == inf:
+            return None
+        path = []
+        while i >= 0:
+            path.append(self.vertices[i])
+            i = self.parent[i]
+        path.reverse()
+        return path
+
+
+class ComponentResult:
+    """Connected components as a label array: label[i] is the component
+    number of vertices[i], components being numbered from 0 to count - 1."""
+    __slots__ = 'vertices', 'index', 'label', 'count'
+
+    def __init__(self, vertices, index, label, count):
+        self.vertices = vertices
+        self.index = index
+        self.label = label
+        self.count = count
+
+    def component_of(self, vertex):
+        return self.label[self.index[vertex]]
+
+    def groups(self):
+        """Return the components as a list of vertex lists."""
+        groups = [[] for _ in range(self.count)]
+        for v, c in zip(self.vertices, self.label):
+            groups[c].append(v)
+        return groups
+
+
+class _IndexedGraph:
+    """Integer-id view of a GraphADT used internally by the algorithms.
+
+    CSRGraph is read straight from its arrays and AdjacencyMapGraph straight
+    from its maps; any other backend goes through GraphADT.neighbours. A
+    backend with its own freeze(), such as ConcurrentGraph, is read through
+    the graph it freezes to, so a search sees a single state of the graph."""
+    __slots__ = 'graph', 'vertices', 'index', 'directed'
+
+    def __init__(self, graph):
+        if type(graph).freeze is not GraphADT.freeze:
+            graph = graph.freeze()
+        self.graph = graph
+        self.directed = graph.is_directed()
+        if isinstance(graph, CSRGraph):
+            self.vertices, self.index = graph._vertices, graph._index
+        else:
+            self.vertices = list(graph.vertices())
+            self.index = {v: i for i, v in enumerate(self.vertices)}
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def successors(self, i, outgoing=True):
+        """Return an iteration of the ids adjacent to id i."""
+        graph = self.graph
+        if isinstance(graph, CSRGraph):
+            offsets, targets = (graph._offsets, graph._targets) if outgoing else (graph._in_offsets, graph._in_targets)
+            return targets[offsets[i]:offsets[i + 1]]
+        if isinstance(graph, AdjacencyMapGraph):
+            adj = graph._outgoing if outgoing else graph._incoming
+            return map(self.index.__getitem__, adj[self.vertices[i]])
+        return (self.index[v] for v, _ in graph.neighbours(self.vertices[i], outgoing))
+
+    def weighted(self, i, outgoing=True):
+        """Return an iteration of (id, weight) pairs adjacent to id i, None weights counting as 1."""
+        graph = self.graph
+        if isinstance(graph, CSRGraph):
+            if outgoing:
+                offsets, targets, weights = graph._offsets, graph._targets, graph._weights
+            else:
+                offsets, targets, weights = graph._in_offsets, graph._in_targets, graph._in_weights
+            lo, hi = offsets[i], offsets[i + 1]
+            if weights is None:
+                return zip(targets[lo:hi], repeat(1))
+            return ((j, 1 if w is None else w) for j, w in zip(targets[lo:hi], weights[lo:hi]))
+        if isinstance(graph, AdjacencyMapGraph):
+            adj = graph._outgoing if outgoing else graph._incoming
+            index = self.index
+            return ((index[v], 1 if e._weight is None else e._weight) for v, e in adj[self.vertices[i]].items())
+        return ((self.index[v], 1 if w is None else w) for v, w in graph.neighbours(self.vertices[i], outgoing))
+
+
+def bfs(graph, source, outgoing=True):
+    """Breadth-first search from source; distances count edges."""
+    g = _IndexedGraph(graph)
+    result = SearchResult(g.vertices, g.index)
+    parent, distance, order = result.parent, result.distance, result.order
+    s = g.index[source]
+    distance[s] = 0
+    order.append(s)
+    queue = deque([s])
+    while queue:
+        i = queue.popleft()
+        d = distance[i] + 1
+        for j in g.successors(i, outgoing):
+            if distance[j] == inf:
+                distance[j] = d
+                parent[j] = i
+                order.append(j)
+                queue.append(j)
+    return result
+
+
+def dfs(graph, source, outgoing=True):
+    """Iterative depth-first search from source; order is the preorder and
+    distances are depths in the DFS tree."""
+    g = _IndexedGraph(graph)
+    result = SearchResult(g.vertices, g.index)
+    parent, distance, order = result.parent, result.distance, result.order
+    s = g.index[source]
+    distance[s] = 0
+    order.append(s)
+    stack = [(s, iter(g.successors(s, outgoing)))]
+    while stack:
+        i, successors = stack[-1]
+        for j in successors:
+            if distance[j] == inf:
+                distance[j] = distance[i] + 1
+                parent[j] = i
+                order.append(j)
+                stack.append((j, iter(g.successors(j, outgoing))))
+                break
+        else:  # every successor of i has been visited
+            stack.pop()
+    return result
+
+
+def dijkstra(graph, source):
+    """Single-source shortest paths for non-negative weights, using a binary
+    heap with lazy deletion of outdated entries."""
+    g = _IndexedGraph(graph)
+    result = SearchResult(g.vertices, g.index)
+    parent, distance, order = result.parent, result.distance, result.order
+    s = g.index[source]
+    distance[s] = 0
+    heap = [(0, s)]
+    while heap:
+        d, i = heappop(heap)
+        if d > distance[i]:  # stale entry, i was already settled with a shorter distance
+            continue
+        order.append(i)
+        for j, w in g.weighted(i):
+            if w < 0:
+                raise ValueError("Dijkstra's algorithm requires non-negative weights")
+            nd = d + w
+            if nd < distance[j]:
+                distance[j] = nd
+                parent[j] = i
+                heappush(heap, (nd, j))
+    return result
+
+
+def bellman_ford(graph, source):
+    """Single-source shortest paths allowing negative weights. Raises
+    ValueError if a negative-weight cycle is reachable from source."""
+    g = _IndexedGraph(graph)
+    result = SearchResult(g.vertices, g.index)
+    parent, distance = result.parent, result.distance
+    origins, targets, weights = array('q'), array('q'), array('d')
+    for i in range(len(g)):
+        for j, w in g.weighted(i):
+            origins.append(i)
+            targets.append(j)
+            weights.append(w)
+    distance[g.index[source]] = 0
+    for _ in range(len(g)):
+        changed = False
+        for i, j, w in zip(origins, targets, weights):
+            if distance[i] + w < distance[j]:
+                distance[j] = distance[i] + w
+                parent[j] = i
+                changed = True
+        if not changed:
+            break
+    else:  # still relaxing after |V| rounds
+        raise ValueError("graph contains a negative-weight cycle")
+    result.order.extend(sorted((i for i in range(len(g)) if distance[i] != inf), key=distance.__getitem__))
+    return result
+
+
+def topological_sort(graph):
+    """Return the vertices of a directed acyclic graph in topological order
+    (Kahn's algorithm). Raises ValueError if the graph has a cycle."""
+    g = _IndexedGraph(graph)
+    in_degree = array('q', [0]) * len(g)
+    for i in range(len(g)):
+        for j in g.successors(i):
+            in_degree[j] += 1
+    queue = deque(i for i in range(len(g)) if in_degree[i] == 0)
+    order = []
+    while queue:
+        i = queue.popleft()
+        order.append(g.vertices[i])
+        for j in g.successors(i):
+            in_degree[j] -= 1
+            if in_degree[j] == 0:
+                queue.append(j)
+    if len(order) != len(g):
+        raise ValueError("graph contains a cycle")
+    return order
+
+
+def connected_components(graph):
+    """Label the connected components of graph; for a directed graph the
+    weakly connected components are reported."""
+    g = _IndexedGraph(graph)
+    label = array('q', [-1]) * len(g)
+    count = 0
+    for s in range(len(g)):
+        if label[s] != -1:
+            continue
+        label[s] = count
+        stack = [s]
+        while stack:
+            i = stack.pop()
+            for j in g.successors(i):
+                if label[j] == -1:
+                    label[j] = count
+                    stack.append(j)
+            if g.directed:
+                for j in g.successors(i, outgoing=False):
+                    if label[j] == -1:
+                        label[j] = count
+                        stack.append(j)
+        count += 1
+    return ComponentResult(g.vertices, g.index, label, count)
+
+
+def strongly_connected_components(graph, algorithm='tarjan'):
+    """Label the strongly connected components of graph with either Tarjan's
+    or Kosaraju's algorithm, both iterative and linear in the graph size.
+    Components are numbered in topological order of the condensation: every
+    edge between two components goes from a lower number to a higher one."""
+    if algorithm == 'tarjan':
+        return _tarjan(_IndexedGraph(graph))
+    if algorithm == 'kosaraju':
+        return _kosaraju(_IndexedGraph(graph))
+    raise ValueError(f"unknown algorithm {algorithm!r}, expected 'tarjan' or 'kosaraju'")
+
+
+def _tarjan(g):
+    n = len(g)
+    index = array('q', [-1]) * n  # discovery number
+    low = array('q', [0]) * n  # lowest discovery number reachable through the DFS subtree
+    on_stack = bytearray(n)
+    label = array('q', [-1]) * n
+    stack = []
+    counter = count = 0
+    for s in range(n):
+        if index[s] != -1:
+            continue
+        index[s] = low[s] = counter
+        counter += 1
+        stack.append(s)
+        on_stack[s] = 1
+        work = [(s, iter(g.successors(s)))]
+        while work:
+            i, successors = work[-1]
+            for j in successors:
+                if index[j] == -1:
+                    index[j] = low[j] = counter
+                    counter += 1
+                    stack.append(j)
+                    on_stack[j] = 1
+                    work.append((j, iter(g.successors(j))))
+                    break
+                if on_stack[j] and index[j] < low[i]:
+                    low[i] = index[j]
+            else:  # every successor of i is done
+                work.pop()
+                if work and low[i] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[i]
+                if low[i] == index[i]:  # i is the root of a component
+                    while True:
+                        j = stack.pop()
+                        on_stack[j] = 0
+                        label[j] = count
+                        if j == i:
+                            break
+                    count += 1
+    # Tarjan finds the components in reverse topological order
+    for i in range(n):
+        label[i] = count - 1 - label[i]
+    return ComponentResult(g.vertices, g.index, label, count)
+
+
+def _kosaraju(g):
+    n = len(g)
+    finished = array('q')
+    visited = bytearray(n)
+    for s in range(n):
+        if visited[s]:
+            continue
+        visited[s] = 1
+        work = [(s, iter(g.successors(s)))]
+        while work:
+            i, successors = work[-1]
+            for j in successors:
+                if not visited[j]:
+                    visited[j] = 1
+                    work.append((j, iter(g.successors(j))))
+                    break
+            else:
+                work.pop()
+                finished.append(i)
+    # Sweep the reversed graph in decreasing finish time; each sweep is one component
+    label = array('q', [-1]) * n
+    count = 0
+    for s in reversed(finished):
+        if label[s] != -1:
+            continue
+        label[s] = count
+        stack = [s]
+        while stack:
+            i = stack.pop()
+            for j in g.successors(i, outgoing=False):
+                if label[j] == -1:
+                    label[j] = count
+                    stack.append(j)
+        count += 1
+    return ComponentResult(g.vertices, g.index, label, count)
+
+
+def find_cycle(graph):
+    """Return a list of vertices forming a cycle, each joined to the next and
+    the last to the first, or None if graph is acyclic. The search visits the
+    vertices in the graph's order, so the witness is deterministic."""
+    g = _IndexedGraph(graph)
+    n = len(g)
+    state = bytearray(n)  # 0 unvisited, 1 on the DFS path, 2 done
+    parent = array('q', [-1]) * n
+    for s in range(n):
+        if state[s]:
+            continue
+        state[s] = 1
+        work = [(s, iter(g.successors(s)))]
+        while work:
+            i, successors = work[-1]
+            for j in successors:
+                if state[j] == 0:
+                    state[j] = 1
+                    parent[j] = i
+                    work.append((j, iter(g.successors(j))))
+                    break
+                if state[j] == 1 and (g.directed or j != parent[i]):  # an edge back into the path
+                    cycle = [i]
+                    while cycle[-1] != j:
+                        cycle.append(parent[cycle[-1]])
+                    cycle.reverse()
+                    return [g.vertices[k] for k in cycle]
+            else:
+                work.pop()
+                state[i] = 2
+    return None
+
+
+def condensation(graph, components=None):
+    """Return the condensation of graph as a directed acyclic CSRGraph: vertex
+    Vertex(c) stands for strongly connected component c, and there is one
+    edge c -> d whenever some edge of graph leads from component c to d.
+    components may be a result of strongly_connected_components for graph."""
+    g = _IndexedGraph(graph)
+    if components is None:
+        components = _tarjan(g)
+    label, count = components.label, components.count
+    members = [[] for _ in range(count)]
+    for i in range(len(g)):
+        members[label[i]].append(i)
+    offsets = array('q', [0])
+    targets = array('q')
+    seen = array('q', [-1]) * count  # last component that linked to each component
+    for c in range(count):
+        for i in members[c]:
+            for j in g.successors(i):
+                d = label[j]
+                if d != c and seen[d] != c:
+                    seen[d] = c
+                    targets.append(d)
+        offsets.append(len(targets))
+    # Two transpositions sort every row in linear time; the first is the incoming side
+    incoming = _transpose(count, offsets, targets, None)
+    offsets, targets, _ = _transpose(count, incoming[0], incoming[1], None)
+    return CSRGraph([Vertex(c) for c in range(count)], offsets, targets, None, True, incoming)
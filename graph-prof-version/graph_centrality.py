@@ -0,0 +1,186 @@
+from array import array
+
+from main import to_csr
+
+try:
+    import numpy
+except ImportError:  # fall back to plain Python loops over the CSR arrays
+    numpy = None
+
+
+class CentralityResult:
+    """Scores aligned to a stable vertex ordering: scores[i] belongs to
+    vertices[i], the order of the graph's CSR form. scores is a numpy array
+    when numpy is installed and an array('d') otherwise."""
+    __slots__ = 'vertices', 'index', 'scores', 'iterations', 'converged'
+
+    def __init__(self, vertices, index, scores, iterations=0, converged=True):
+        self.vertices = vertices
+        self.index = index
+        self.scores = scores
+        self.iterations = iterations
+        self.converged = converged
+
+    def score_of(self, vertex):
+        return float(self.scores[self.index[vertex]])
+
+    def top(self, k):
+        """Return the k (vertex, score) pairs with the highest score, highest first."""
+        ranked = sorted(range(len(self.vertices)), key=self.scores.__getitem__, reverse=True)
+        return [(self.vertices[i], float(self.scores[i])) for i in ranked[:k]]
+
+
+class TransitionMatrix:
+    """Sparse random-walk transition structure of a graph, built once and
+    reused by every centrality run.
+
+    The edges are kept in coordinate form, edge k going from sources[k] to
+    targets[k] with probability coefficient[k] (its weight over the total
+    outgoing weight of its source), so one power-iteration step is a single
+    scatter-add over the edges: numpy.bincount when numpy is available, a
+    Python loop otherwise. Vertices without outgoing edges are dangling and
+    spread their rank uniformly."""
+
+    def __init__(self, graph, weighted=False):
+        csr = self.csr = to_csr(graph)
+        n = self.n = csr.vertex_count()
+        self.vertices, self.index = csr._vertices, csr._index
+        offsets, targets = csr._offsets, csr._targets
+        if weighted and csr._weights is not None:
+            weights = [1.0 if w is None else float(w) for w in csr._weights]
+        else:
+            weights = None
+        if numpy is not None:
+            offsets = numpy.frombuffer(offsets, dtype=numpy.int64)
+            self.targets = numpy.frombuffer(targets, dtype=numpy.int64)
+            self.sources = numpy.repeat(numpy.arange(n), numpy.diff(offsets))
+            self.weights = numpy.ones(len(self.targets)) if weights is None else numpy.array(weights)
+            out_weight = numpy.bincount(self.sources, weights=self.weights, minlength=n)
+            self.dangling = numpy.flatnonzero(out_weight == 0)
+            self.coefficient = self.weights / out_weight[self.sources]
+        else:
+            self.targets = targets
+            self.sources = array('q')
+            for i in range(n):
+                self.sources.extend([i] * (offsets[i + 1] - offsets[i]))
+            self.weights = array('d', [1.0]) * len(targets) if weights is None else array('d', weights)
+            out_weight = [0.0] * n
+            for i, w in zip(self.sources, self.weights):
+                out_weight[i] += w
+            self.dangling = array('q', (i for i in range(n) if out_weight[i] == 0))
+            self.coefficient = array('d', (w / out_weight[i] for i, w in zip(self.sources, self.weights)))
+
+    def _scatter(self, values, along, into):
+        """Return y with y[into[k]] summing values[along[k]] * coefficient[k] over the edges."""
+        if numpy is not None:
+            return numpy.bincount(into, weights=values[along] * self.coefficient, minlength=self.n)
+        result = [0.0] * self.n
+        for i, j, c in zip(along, into, self.coefficient):
+            result[j] += values[i] * c
+        return result
+
+    def _plain(self, values, along, into):
+        """Like _scatter but with the raw edge weights, as HITS needs."""
+        if numpy is not None:
+            return numpy.bincount(into, weights=values[along] * self.weights, minlength=self.n)
+        result = [0.0] * self.n
+        for i, j, w in zip(along, into, self.weights):
+            result[j] += values[i] * w
+        return result
+
+    def _start(self, start):
+        """Return the initial vector: uniform, or start aligned to our vertices
+        and normalized. start may be a CentralityResult of an earlier run, even
+        on a graph with other vertices, or a sequence in our vertex order."""
+        n = self.n
+        if start is None:
+            vector = [1.0 / n] * n
+        elif isinstance(start, CentralityResult):
+            vector = [float(start.scores[start.index[v]]) if v in start.index else 0.0 for v in self.vertices]
+        else:
+            vector = [float(x) for x in start]
+            if len(vector) != n:
+                raise ValueError(f"start vector has {len(vector)} entries for {n} vertices")
+        total = sum(vector)
+        if total <= 0:
+            vector, total = [1.0] * n, n
+        vector = [x / total for x in vector]
+        return numpy.array(vector) if numpy is not None else vector
+
+    def _result(self, vector, iterations=0, converged=True):
+        scores = vector if numpy is not None else array('d', vector)
+        return CentralityResult(self.vertices, self.index, scores, iterations, converged)
+
+
+def _transition(graph, weighted=False):
+    return graph if isinstance(graph, TransitionMatrix) else TransitionMatrix(graph, weighted)
+
+
+def _distance(x, y):
+    """Return the L1 distance between two vectors."""
+    if numpy is not None:
+        return float(numpy.abs(x - y).sum())
+    return sum(abs(a - b) for a, b in zip(x, y))
+
+
+def _normalized(x):
+    total = float(x.sum() if numpy is not None else sum(x))
+    if numpy is not None:
+        return x / total if total else x
+    return [v / total for v in x] if total else x
+
+
+def pagerank(graph, damping=0.85, tolerance=1e-10, max_iterations=100, start=None, weighted=False):
+    """Return the PageRank of every vertex as a CentralityResult.
+
+    graph may be a GraphADT or a TransitionMatrix built from one, so repeated
+    runs skip the conversion. Power iteration stops once the L1 change of the
+    rank vector drops below tolerance, or after max_iterations with converged
+    set to False. Pass the previous result as start to warm-start after the
+    graph changed a little."""
+    t = _transition(graph, weighted)
+    n = t.n
+    if n == 0:
+        return t._result([])
+    rank = t._start(start)
+    teleport = (1 - damping) / n
+    for iteration in range(1, max_iterations + 1):
+        spread = t._scatter(rank, t.sources, t.targets)
+        leaked = (rank[t.dangling].sum() if numpy is not None else sum(rank[i] for i in t.dangling)) / n
+        if numpy is not None:
+            new = damping * (spread + leaked) + teleport
+        else:
+            new = [damping * (x + leaked) + teleport for x in spread]
+        if _distance(new, rank) < tolerance:
+            return t._result(new, iteration)
+        rank = new
+    return t._result(rank, max_iterations, False)
+
+
+def in_degree_centrality(graph):
+    """Return the in-degree of every vertex divided by n - 1."""
+    csr = to_csr(graph)
+    n = csr.vertex_count()
+    scale = 1 / (n - 1) if n > 1 else 1.0
+    offsets = csr._in_offsets
+    scores = array('d', ((offsets[i + 1] - offsets[i]) * scale for i in range(n)))
+    if numpy is not None:
+        scores = numpy.array(scores)
+    return CentralityResult(csr._vertices, csr._index, scores)
+
+
+def hits(graph, tolerance=1e-10, max_iterations=100, start=None, weighted=False):
+    """Return (hubs, authorities) as two CentralityResults, each summing to 1.
+    start may be the hubs result of an earlier run."""
+    t = _transition(graph, weighted)
+    if t.n == 0:
+        return t._result([]), t._result([])
+    hubs = t._start(start)
+    authorities = hubs
+    for iteration in range(1, max_iterations + 1):
+        authorities = _normalized(t._plain(hubs, t.sources, t.targets))
+        new = _normalized(t._plain(authorities, t.targets, t.sources))
+        if _distance(new, hubs) < tolerance:
+            return t._result(new, iteration), t._result(authorities, iteration)
+        hubs = new
+    return t._result(hubs, max_iterations, False), t._result(authorities, max_iterations, False)
@@ -0,0 +1,204 @@
+from contextlib import contextmanager
+from threading import Condition, Lock, get_ident
+
+from main import GraphADT, to_csr
+
+
+class ReadWriteLock:
+    """Lock letting any number of readers in at once, or a single writer.
+    A waiting writer keeps new readers out, so a steady stream of readers
+    cannot starve writers. Both sides are reentrant: a thread already
+    reading may read again without waiting, and the thread holding the
+    write side may take either side again, so a listener run during a
+    mutation can query or change the graph. A reader may not upgrade to
+    writing, which would wait on itself; that raises RuntimeError."""
+
+    def __init__(self):
+        self._condition = Condition(Lock())
+        self._readers = 0  # threads holding the read side
+        self._read_depth = {}  # thread ident -> nested read acquisitions
+        self._writer = None  # ident of the thread holding the write side
+        self._writer_depth = 0  # nested acquisitions by that thread
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._condition:
+            me = get_ident()
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._read_depth:  # already in: waiting for a writer would wait on ourselves
+                self._read_depth[me] += 1
+                return
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._read_depth[me] = 1
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            me = get_ident()
+            if self._writer == me:
+                self._writer_depth -= 1
+                return
+            self._read_depth[me] -= 1
+            if self._read_depth[me]:
+                return
+            del self._read_depth[me]
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            me = get_ident()
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me in self._read_depth:
+                raise RuntimeError("cannot take the write lock while holding the read lock")
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+
+    def release_write(self):
+        with self._condition:
+            if self._writer_depth:
+                self._writer_depth -= 1
+                return
+            self._writer = None
+            self._condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentGraph(GraphADT):
+    """Thread-safe wrapper around any mutable GraphADT backend.
+
+    Queries run under the read side of a ReadWriteLock, so readers never
+    wait for each other; mutations run under the write side. Iterations are
+    copied into lists before the lock is released, so a reader never sees
+    a half-applied change or a container resized under it. For long scans,
+    snapshot() returns a read-only CSRGraph of the current state, rebuilt
+    only after the graph changed (copy-on-write), which readers can use
+    without holding any lock."""
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._directed = graph.is_directed()
+        self._lock = ReadWriteLock()
+        self._snapshot_lock = Lock()  # so that concurrent callers build one snapshot
+        self._snapshot = None
+        self._snapshot_version = -1
+
+    @contextmanager
+    def reading(self):
+        """Hold the read lock and give access to the wrapped graph, for
+        several queries that must see the same state."""
+        with self._lock.read():
+            yield self._graph
+
+    @contextmanager
+    def writing(self):
+        """Hold the write lock and give access to the wrapped graph."""
+        with self._lock.write():
+            yield self._graph
+
+    def snapshot(self):
+        """Return a read-only CSRGraph of the graph as of now."""
+        # read lock first: a listener asking for a snapshot under the write
+        # lock then never waits on a reader holding the snapshot lock
+        with self._lock.read(), self._snapshot_lock:
+            version = self._graph._version
+            if self._snapshot is None or version != self._snapshot_version:
+                self._snapshot = to_csr(self._graph)
+                self._snapshot_version = version
+            return self._snapshot
+
+    def freeze(self):
+        return self.snapshot()
+
+    def save(self, path):
+        """Write the current snapshot to path, so a concurrent mutation cannot
+        tear the file."""
+        from graph_io import save
+        save(self.snapshot(), path)
+
+    def vertex_count(self):
+        with self._lock.read():
+            return self._graph.vertex_count()
+
+    def vertices(self):
+        with self._lock.read():
+            return list(self._graph.vertices())
+
+    def edge_count(self):
+        with self._lock.read():
+            return self._graph.edge_count()
+
+    def edges(self):
+        with self._lock.read():
+            return list(self._graph.edges())
+
+    def get_edge(self, vertex1, vertex2):
+        with self._lock.read():
+            return self._graph.get_edge(vertex1, vertex2)
+
+    def degree(self, vertex, outgoing=True):
+        with self._lock.read():
+            return self._graph.degree(vertex, outgoing)
+
+    def incident_edges(self, vertex, outgoing=True):
+        with self._lock.read():
+            return list(self._graph.incident_edges(vertex, outgoing))
+
+    def neighbours(self, vertex, outgoing=True):
+        with self._lock.read():
+            return list(self._graph.neighbours(vertex, outgoing))
+
+    def insert_vertex(self, vertex):
+        with self._lock.write():
+            return self._graph.insert_vertex(vertex)
+
+    def insert_edge(self, vertex1, vertex2, weight=None):
+        with self._lock.write():
+            return self._graph.insert_edge(vertex1, vertex2, weight)
+
+    def bulk_insert_edges(self, edges):
+        edges = list(edges)  # consume a generator before taking the lock
+        with self._lock.write():
+            return self._graph.bulk_insert_edges(edges)
+
+    def remove_vertex(self, vertex):
+        with self._lock.write():
+            return self._graph.remove_vertex(vertex)
+
+    def remove_edge(self, edge):
+        with self._lock.write():
+            return self._graph.remove_edge(edge)
+
+    def subscribe(self, listener):
+        """Subscribe to the wrapped graph. Listeners run under the write lock
+        and may read or change this wrapper from within."""
+        with self._lock.write():
+            self._graph.subscribe(listener)
+
+    def unsubscribe(self, listener):
+        with self._lock.write():
+            self._graph.unsubscribe(listener)
@@ -0,0 +1,165 @@
+from array import array
+from collections import deque
+
+from graph_mst import DisjointSet
+
+
+class ChangeLog:
+    """Graph listener (see GraphADT.subscribe) that records mutations as a
+    compact event stream: one byte per event code and two int64 columns of
+    vertex ids, vertices being interned the first time they appear. Only
+    insert_edge events keep a Python object, their weight."""
+    INSERT_VERTEX, INSERT_EDGE, REMOVE_EDGE, REMOVE_VERTEX = range(4)
+    _CODES = {'insert_vertex': INSERT_VERTEX, 'insert_edge': INSERT_EDGE,
+              'remove_edge': REMOVE_EDGE, 'remove_vertex': REMOVE_VERTEX}
+    _NAMES = {code: name for name, code in _CODES.items()}
+
+    def __init__(self, graph=None):
+        self._codes = array('B')
+        self._first = array('q')
+        self._second = array('q')  # -1 for single-vertex events
+        self._weights = {}  # event position -> weight of an insert_edge event
+        self._vertices = []
+        self._ids = {}
+        if graph is not None:
+            graph.subscribe(self)
+
+    def _id(self, vertex):
+        i = self._ids.get(vertex)
+        if i is None:
+            i = self._ids[vertex] = len(self._vertices)
+            self._vertices.append(vertex)
+        return i
+
+    def __call__(self, event, *args):
+        code = self._CODES[event]
+        if code == self.INSERT_EDGE and args[2] is not None:
+            self._weights[len(self._codes)] = args[2]
+        self._codes.append(code)
+        self._first.append(self._id(args[0]))
+        self._second.append(self._id(args[1]) if code in (self.INSERT_EDGE, self.REMOVE_EDGE) else -1)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __iter__(self):
+        return self.since(0)
+
+    def since(self, position):
+        """Yield (event, vertex1, vertex2, weight) for every event recorded from
+        position on, vertex2 and weight being None when they do not apply."""
+        vertices = self._vertices
+        for k in range(position, len(self._codes)):
+            second = self._second[k]
+            yield (self._NAMES[self._codes[k]], vertices[self._first[k]],
+                   vertices[second] if second >= 0 else None, self._weights.get(k))
+
+    def clear(self):
+        """Drop the recorded events, keeping the interned vertices."""
+        del self._codes[:], self._first[:], self._second[:]
+        self._weights.clear()
+
+
+class IncrementalComponents:
+    """Connected components of a graph kept up to date as it changes (weakly
+    connected components for a directed graph).
+
+    Vertices map to ids of a DisjointSet, so edge insertions are a single
+    union. An edge or vertex removal can split a component, which union-find
+    cannot undo: the affected part is searched again and the vertices of every
+    piece split off are moved to fresh ids, leaving their old ids unused."""
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._sets = DisjointSet()
+        self._ids = {}
+        self._count = 0
+        for v in graph.vertices():
+            self._add(v)
+        for v in graph.vertices():
+            for u, _ in graph.neighbours(v):
+                self._union(v, u)
+        graph.subscribe(self)
+
+    def _add(self, vertex):
+        self._ids[vertex] = self._sets.add()
+        self._count += 1
+
+    def _union(self, u, v):
+        if self._sets.union(self._ids[u], self._ids[v]):
+            self._count -= 1
+
+    def _adjacent(self, vertex):
+        graph = self._graph
+        for u, _ in graph.neighbours(vertex):
+            yield u
+        if graph.is_directed():
+            for u, _ in graph.neighbours(vertex, outgoing=False):
+                yield u
+
+    def _relabel(self, piece):
+        i = self._sets.add()
+        for v in piece:
+            self._ids[v] = i
+
+    def _split_if_disconnected(self, u, v):
+        """Search from u and v in lockstep. If they meet, nothing changes and
+        None is returned; otherwise the search that runs out first has found
+        the smaller piece, which becomes a component of its own and is returned."""
+        searches = ((deque([u]), {u}), (deque([v]), {v}))
+        while True:
+            for side in (0, 1):
+                queue, seen = searches[side]
+                if not queue:
+                    self._relabel(seen)
+                    self._count += 1
+                    return seen
+                for w in self._adjacent(queue.popleft()):
+                    if w in searches[1 - side][1]:
+                        return None
+                    if w not in seen:
+                        seen.add(w)
+                        queue.append(w)
+
+    def __call__(self, event, *args):
+        if event == 'insert_vertex':
+            self._add(args[0])
+        elif event == 'insert_edge':
+            self._union(args[0], args[1])
+        elif event == 'remove_edge':
+            u, v = args
+            if u is not v:
+                self._split_if_disconnected(u, v)
+        elif event == 'remove_vertex':
+            vertex, adjacent = args
+            del self._ids[vertex]
+            if not adjacent:
+                self._count -= 1
+                return
+            # every remaining piece of the old component holds some adjacent vertex; the
+            # pieces not split off yet keep the old id, and so does anchor
+            anchor = adjacent[0]
+            for u in adjacent[1:]:
+                if not self.connected(anchor, u):  # u's piece was already split off
+                    continue
+                piece = self._split_if_disconnected(anchor, u)
+                if piece is not None and anchor in piece:
+                    anchor = u
+
+    def connected(self, u, v):
+        return self._sets.connected(self._ids[u], self._ids[v])
+
+    def component_of(self, vertex):
+        """Return an integer naming the component of vertex; it stays valid
+        until the next mutation of the graph."""
+        return self._sets.find(self._ids[vertex])
+
+    def count(self):
+        return self._count
+
+    def components(self):
+        """Return the components as a list of vertex lists."""
+        groups = {}
+        for v, i in self._ids.items():
+            groups.setdefault(self._sets.find(i), []).append(v)
+        return list(groups.values())
@@ -0,0 +1,178 @@
+"""Random and regular graph generators for tests and load testing.
+
+Every generator yields its edges as (i, j) pairs of integer vertex ids in
+0..n-1 without building anything, and takes a seed that is either None, an
+int or a random.Random instance, so runs are reproducible. build() turns a
+stream of pairs into a graph: straight into CSR arrays by default, or into
+any GraphADT backend through its bulk_insert_edges path.
+"""
+import random
+from array import array
+from math import isqrt, log
+
+from main import CSRGraph, Vertex, _transpose
+
+
+def _rng(seed):
+    return seed if isinstance(seed, random.Random) else random.Random(seed)
+
+
+def gnp(n, p, seed=None, directed=False):
+    """Erdős–Rényi G(n, p): every pair is an edge independently with
+    probability p. Instead of flipping a coin per pair, the gap to the next
+    edge is drawn from the geometric distribution (Batagelj and Brandes), so
+    a sparse graph costs O(n + m) rather than O(n²)."""
+    if p <= 0 or n < 2:
+        return
+    if p >= 1:
+        for v in range(n):
+            for w in range(n if directed else v):
+                if w != v:
+                    yield (v, w) if directed else (w, v)
+        return
+    rng = _rng(seed)
+    log_q = log(1 - p)
+    v, w = (0, -1) if directed else (1, -1)
+    while v < n:
+        w += 1 + int(log(1 - rng.random()) / log_q)
+        if directed:  # walk the n x n pairs row by row, dropping the diagonal
+            while w >= n and v < n:
+                w -= n
+                v += 1
+            if v < n and w != v:
+                yield v, w
+        else:  # walk the pairs w < v of the lower triangle
+            while w >= v and v < n:
+                w -= v
+                v += 1
+            if v < n:
+                yield w, v
+
+
+def gnm(n, m, seed=None, directed=False):
+    """Erdős–Rényi G(n, m): m distinct edges chosen uniformly at random. The
+    edges are sampled as indexes into the list of all possible pairs, which
+    is never built, so any density costs O(m)."""
+    pairs = n * (n - 1) if directed else n * (n - 1) // 2
+    if m > pairs:
+        raise ValueError(f"a graph on {n} vertices has at most {pairs} edges")
+    for k in _rng(seed).sample(range(pairs), m):
+        if directed:
+            v, w = divmod(k, n - 1)
+            yield v, w + (w >= v)  # skip the diagonal
+        else:
+            v = (1 + isqrt(1 + 8 * k)) // 2  # row of the k-th lower-triangle pair
+            yield k - v * (v - 1) // 2, v
+
+
+def barabasi_albert(n, m, seed=None):
+    """Barabási–Albert preferential attachment: vertices m..n-1 arrive one
+    at a time and join m distinct earlier vertices, picked with probability
+    proportional to their degree, which gives a power-law degree tail."""
+    if not 1 <= m < n:
+        raise ValueError("barabasi_albert needs 1 <= m < n")
+    rng = _rng(seed)
+    targets = list(range(m))
+    repeated = []  # every vertex once per unit of degree
+    for source in range(m, n):
+        for t in targets:
+            yield t, source
+        repeated.extend(targets)
+        repeated.extend([source] * m)
+        chosen = set()
+        while len(chosen) < m:
+            chosen.add(rng.choice(repeated))
+        targets = list(chosen)
+
+
+def watts_strogatz(n, k, p, seed=None):
+    """Watts–Strogatz small world: a ring where every vertex is joined to its
+    k nearest neighbours (k // 2 on each side), then each edge has its far
+    end rewired to a uniformly random vertex with probability p, avoiding
+    self-loops and duplicate edges."""
+    if k >= n:
+        raise ValueError("watts_strogatz needs k < n")
+    rng = _rng(seed)
+    edges = {}  # (min, max) -> None, an insertion-ordered set
+    degree = [0] * n
+    for j in range(1, k // 2 + 1):
+        for v in range(n):
+            w = (v + j) % n
+            if (min(v, w), max(v, w)) not in edges:
+                edges[min(v, w), max(v, w)] = None
+                degree[v] += 1
+                degree[w] += 1
+    for v, w in list(edges):
+        if rng.random() >= p or degree[v] >= n - 1:  # v already joined to every vertex
+            continue
+        if 2 * degree[v] < n:  # mostly free: draw until a non-neighbour comes up
+            u = rng.randrange(n)
+            while u == v or (min(v, u), max(v, u)) in edges:
+                u = rng.randrange(n)
+        else:  # mostly taken: pick among the non-neighbours directly
+            u = rng.choice([u for u in range(n) if u != v and (min(v, u), max(v, u)) not in edges])
+        del edges[v, w]
+        edges[min(v, u), max(v, u)] = None
+        degree[w] -= 1
+        degree[u] += 1
+    yield from edges
+
+
+def grid_2d(rows, columns, periodic=False):
+    """2-D grid of rows x columns vertices, vertex (r, c) having id
+    r * columns + c; periodic wraps both dimensions into a torus."""
+    for r in range(rows):
+        for c in range(columns):
+            i = r * columns + c
+            if c + 1 < columns:
+                yield i, i + 1
+            elif periodic and columns > 2:
+                yield i, r * columns
+            if r + 1 < rows:
+                yield i, i + columns
+            elif periodic and rows > 2:
+                yield i, c
+
+
+def _bucket(n, keys, values):
+    """Counting sort: return (offsets, grouped) with the values of key i at
+    grouped[offsets[i]:offsets[i + 1]], in their original order."""
+    offsets = array('q', bytes(8 * (n + 1)))
+    for i in keys:
+        offsets[i + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    cursor = array('q', offsets[:-1])
+    grouped = array('q', bytes(8 * len(values)))
+    for i, j in zip(keys, values):
+        grouped[cursor[i]] = j
+        cursor[i] += 1
+    return offsets, grouped
+
+
+def build(pairs, n, backend=CSRGraph, directed=False, weight=None, vertices=None):
+    """Build a graph on n vertices from a stream of (i, j) id pairs.
+
+    vertices defaults to [Vertex(0), ..., Vertex(n - 1)]. Every edge gets the
+    given weight; note that AdjacencyMatrixGraph and DenseMatrixGraph need a
+    weight other than None. For CSRGraph the pairs are counting-sorted into
+    the CSR arrays directly: bucketing by target and then by source leaves
+    every row sorted without any comparison sort."""
+    vertices = vertices if vertices is not None else [Vertex(i) for i in range(n)]
+    if backend is not CSRGraph:
+        graph = backend(directed=directed)
+        for v in vertices:
+            graph.insert_vertex(v)
+        graph.bulk_insert_edges((vertices[i], vertices[j], weight) for i, j in pairs)
+        return graph
+    sources, targets = array('q'), array('q')
+    for i, j in pairs:
+        sources.append(i)
+        targets.append(j)
+        if not directed and i != j:  # an undirected self-loop is listed once in its row
+            sources.append(j)
+            targets.append(i)
+    offsets, grouped = _bucket(n, targets, sources)  # rows by target, holding sources
+    offsets, targets, _ = _transpose(n, offsets, grouped, None)  # rows by source, sorted
+    weights = None if weight is None else array('d', [weight]) * len(targets)
+    return CSRGraph(vertices, offsets, targets, weights, directed)
@@ -0,0 +1,175 @@
+import os
+import struct
+from array import array
+from collections.abc import Sequence
+from mmap import ACCESS_READ, mmap as memory_map
+
+from main import AdjacencyMapGraph, CSRGraph, Vertex, to_csr
+
+# Binary layout, all integers little-endian and every section 8-byte aligned:
+#   header        magic, version, flags, vertex count n, stored edge count m, label bytes,
+#                 self-loop count of an undirected graph
+#   label table   n + 1 int64 offsets into a UTF-8 blob of the vertex labels
+#   out arrays    n + 1 int64 offsets, m int64 targets, m float64 weights if weighted
+#   in arrays     the same three arrays for the reversed graph, directed graphs only
+_MAGIC = b'GRAPHCSR'
+_VERSION = 2
+_HEADER = struct.Struct('<8sIIQQQQ')
+_DIRECTED, _WEIGHTED = 1, 2
+
+
+def _lines(path, chunk_size=1 << 20, use_mmap=False):
+    """Yield the lines of a file as bytes, reading it in large chunks or
+    through a memory map instead of line by line."""
+    with open(path, 'rb') as file:
+        if use_mmap:
+            if os.fstat(file.fileno()).st_size == 0:  # an empty file cannot be mapped
+                return
+            with memory_map(file.fileno(), 0, access=ACCESS_READ) as mapped:
+                yield from iter(mapped.readline, b'')
+            return
+        tail = b''
+        while chunk := file.read(chunk_size):
+            lines = (tail + chunk).split(b'\n')
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
+
+
+def iter_edge_list(path, delimiter=None, comment='#', chunk_size=1 << 20, use_mmap=False):
+    """Yield (label1, label2, weight) triples from a text file with one
+    'u v [weight]' edge per line. Fields are split on whitespace by default
+    or on delimiter (e.g. ',' for CSV); weight is None when absent. Blank
+    lines and lines starting with comment are skipped."""
+    separator = delimiter.encode() if delimiter is not None else None
+    marker = comment.encode() if comment else None
+    for line in _lines(path, chunk_size, use_mmap):
+        line = line.strip()
+        if not line or marker and line.startswith(marker):
+            continue
+        fields = line.split(separator)
+        if len(fields) < 2:
+            raise ValueError(f"malformed edge line: {line.decode(errors='replace')!r}")
+        weight = float(fields[2]) if len(fields) > 2 and fields[2].strip() else None
+        yield fields[0].strip().decode(), fields[1].strip().decode(), weight
+
+
+def read_edge_list(path, graph=None, directed=False, delimiter=None, labels=None, use_mmap=False,
+                   chunk_size=1 << 20):
+    """Load an edge-list file into graph (a new AdjacencyMapGraph by default)
+    through its bulk_insert_edges path and return the graph. Labels are
+    interned into Vertex objects as they are read; pass a labels dict to
+    share the same vertices across several files."""
+    if graph is None:
+        graph = AdjacencyMapGraph(directed=directed)
+    if labels is None:
+        labels = {}
+
+    def interned():
+        for label1, label2, weight in iter_edge_list(path, delimiter, chunk_size=chunk_size, use_mmap=use_mmap):
+            vertex1 = labels.get(label1)
+            if vertex1 is None:
+                vertex1 = labels[label1] = Vertex(label1)
+            vertex2 = labels.get(label2)
+            if vertex2 is None:
+                vertex2 = labels[label2] = Vertex(label2)
+            yield vertex1, vertex2, weight
+
+    graph.bulk_insert_edges(interned())
+    return graph
+
+
+def _padding(size):
+    return b'\0' * (-size % 8)
+
+
+def save(graph, path):
+    """Write graph to path in the compact binary CSR layout. Vertex labels
+    are stored as the text of their values and weights must be numbers or
+    all None."""
+    csr = to_csr(graph)
+    weights = csr._weights
+    if weights is not None and not isinstance(weights, (array, memoryview)):
+        raise ValueError("only numeric weights can be saved")
+    blob = bytearray()
+    label_offsets = array('q', [0])
+    for v in csr.vertices():
+        blob += str(v).encode()
+        label_offsets.append(len(blob))
+    flags = (_DIRECTED if csr.is_directed() else 0) | (_WEIGHTED if weights is not None else 0)
+    sections = [(csr._offsets, csr._targets, weights)]
+    if csr.is_directed():
+        sections.append((csr._in_offsets, csr._in_targets, csr._in_weights))
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, flags, csr.vertex_count(), len(csr._targets), len(blob),
+                                csr._loops))
+        file.write(label_offsets)
+        file.write(blob + _padding(len(blob)))
+        for offsets, targets, weights in sections:
+            file.write(offsets)
+            file.write(targets)
+            if weights is not None:
+                file.write(weights)
+
+
+class _Labels(Sequence):
+    """The vertices of a loaded graph. Each label is decoded into its Vertex
+    the first time it is asked for, and that same Vertex is returned after."""
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+        self._decoded = [None] * (len(offsets) - 1)
+
+    def __len__(self):
+        return len(self._decoded)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        vertex = self._decoded[i]
+        if vertex is None:
+            i = range(len(self._decoded))[i]  # the offsets take no negative ids
+            vertex = self._decoded[i] = Vertex(str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8'))
+        return vertex
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self._decoded)))
+
+
+def load(path, mmap=True):
+    """Read a graph written by save() and return it as a CSRGraph. With mmap
+    set, the arrays are zero-copy views of a read-only memory map of the
+    file, so opening is near-instant and processes loading the same file
+    share its pages; otherwise they are copied into arrays. Vertex labels
+    are decoded only when a vertex is first asked for."""
+    with open(path, 'rb') as file:
+        if mmap:
+            buffer = memoryview(memory_map(file.fileno(), 0, access=ACCESS_READ))
+        else:
+            buffer = memoryview(file.read())
+    magic, version, flags, n, m, label_bytes, loops = _HEADER.unpack_from(buffer)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path} is not a graph file of version {_VERSION}")
+    position = _HEADER.size
+
+    def take(count, typecode):
+        nonlocal position
+        view = buffer[position:position + 8 * count].cast(typecode)
+        position += 8 * count
+        return view if mmap else array(typecode, view)
+
+    label_offsets = take(n + 1, 'q')
+    blob = buffer[position:position + label_bytes]
+    position += label_bytes + len(_padding(label_bytes))
+    vertices = _Labels(label_offsets, blob if mmap else bytes(blob))
+
+    def take_arrays():
+        return take(n + 1, 'q'), take(m, 'q'), take(m, 'd') if flags & _WEIGHTED else None
+
+    offsets, targets, weights = take_arrays()
+    incoming = take_arrays() if flags & _DIRECTED else None
+    graph = CSRGraph(vertices, offsets, targets, weights, bool(flags & _DIRECTED), incoming, loops)
+    graph._path = os.fspath(path)  # lets other processes open the same file
+    return graph
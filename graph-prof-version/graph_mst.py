@@ -0,0 +1,116 @@
+from array import array
+from heapq import heapify, heappop, heappush
+
+from graph_algorithms import _IndexedGraph
+
+
+class DisjointSet:
+    """Union-find over the integer ids 0..n-1, with path compression and
+    union by rank, so any sequence of operations runs in near-constant
+    amortized time per operation. New ids can be added at any time."""
+
+    def __init__(self, n=0):
+        self._parent = array('q', range(n))
+        self._rank = array('B', bytes(n))
+        self._count = n
+
+    def __len__(self):
+        return len(self._parent)
+
+    def count(self):
+        """Return the number of disjoint sets."""
+        return self._count
+
+    def add(self):
+        """Create a new singleton set and return its id."""
+        i = len(self._parent)
+        self._parent.append(i)
+        self._rank.append(0)
+        self._count += 1
+        return i
+
+    def find(self, i):
+        """Return the representative id of the set containing i."""
+        parent = self._parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:  # point the whole path at the root
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i, j):
+        """Merge the sets containing i and j; return False if they were already one."""
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return False
+        rank = self._rank
+        if rank[i] < rank[j]:
+            i, j = j, i
+        self._parent[j] = i
+        if rank[i] == rank[j]:
+            rank[i] += 1
+        self._count -= 1
+        return True
+
+    def connected(self, i, j):
+        return self.find(i) == self.find(j)
+
+
+def _check_undirected(graph):
+    if graph.is_directed():
+        raise ValueError("minimum spanning trees need an undirected graph")
+
+
+def _edges_by_weight(g):
+    """Yield (weight, i, j) for every undirected edge of the indexed graph g
+    in increasing weight order. Each edge is reported from both endpoints
+    (and stored twice by EdgeListGraph), so only the i < j copy is kept; the
+    heap is popped lazily, so Kruskal never sorts edges it does not need."""
+    heap = [(w, i, j) for i in range(len(g)) for j, w in g.weighted(i) if i < j]
+    heapify(heap)
+    while heap:
+        yield heappop(heap)
+
+
+def kruskal(graph):
+    """Return (total weight, edges) of a minimum spanning forest of an
+    undirected graph, edges being (vertex, vertex, weight) tuples."""
+    _check_undirected(graph)
+    g = _IndexedGraph(graph)
+    components = DisjointSet(len(g))
+    total, tree = 0, []
+    for w, i, j in _edges_by_weight(g):
+        if components.union(i, j):
+            total += w
+            tree.append((g.vertices[i], g.vertices[j], w))
+            if components.count() == 1:
+                break
+    return total, tree
+
+
+def prim(graph):
+    """Return (total weight, edges) of a minimum spanning forest of an
+    undirected graph using Prim's algorithm with a lazy heap: outdated
+    entries stay in the heap and are skipped when popped."""
+    _check_undirected(graph)
+    g = _IndexedGraph(graph)
+    in_tree = bytearray(len(g))
+    total, tree = 0, []
+    for root in range(len(g)):
+        if in_tree[root]:
+            continue
+        in_tree[root] = 1
+        heap = [(w, root, j) for j, w in g.weighted(root)]
+        heapify(heap)
+        while heap:
+            w, i, j = heappop(heap)
+            if in_tree[j]:
+                continue
+            in_tree[j] = 1
+            total += w
+            tree.append((g.vertices[i], g.vertices[j], w))
+            for k, wk in g.weighted(j):
+                if not in_tree[k]:
+                    heappush(heap, (wk, j, k))
+    return total, tree
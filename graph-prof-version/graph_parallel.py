@@ -0,0 +1,63 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from graph_algorithms import SearchResult, bfs, dijkstra
+from graph_io import load, save
+from main import to_csr
+
+_graph = None  # graph opened by each worker process
+
+
+def _open_graph(path):
+    global _graph
+    _graph = load(path, mmap=True)
+
+
+def _search(source_ids, weighted):
+    """Run one search per source id in a worker and return the raw arrays."""
+    search = dijkstra if weighted else bfs
+    results = []
+    for s in source_ids:
+        result = search(_graph, _graph.vertex_at(s))
+        results.append((s, result.parent, result.distance, result.order))
+    return results
+
+
+def _run(graph, sources, workers, chunk_size, weighted):
+    """Shard sources (every vertex when None) across a process pool whose
+    workers all memory-map the same binary graph file, yielding (source,
+    SearchResult) as shards finish."""
+    csr = to_csr(graph)
+    path, temporary = csr._path, None
+    if path is None:  # workers need a file to map; write the graph out once
+        handle, temporary = tempfile.mkstemp(suffix='.graph')
+        os.close(handle)
+        save(csr, temporary)
+        path = temporary
+    ids = range(csr.vertex_count()) if sources is None else [csr.index(s) for s in sources]
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_open_graph, initargs=(path,))
+    try:
+        futures = [executor.submit(_search, ids[k:k + chunk_size], weighted)
+                   for k in range(0, len(ids), chunk_size)]
+        for future in as_completed(futures):
+            for s, parent, distance, order in future.result():
+                yield csr.vertex_at(s), SearchResult(csr.vertices(), csr._index, parent, distance, order)
+    finally:
+        executor.shutdown(cancel_futures=True)
+        if temporary is not None:
+            os.remove(temporary)
+
+
+def parallel_bfs(graph, sources, workers=None, chunk_size=16):
+    """Run a breadth-first search from every vertex of sources on a pool of
+    worker processes, yielding (source, SearchResult) pairs in completion
+    order. Results are aligned to the vertex order of graph.freeze()."""
+    yield from _run(graph, sources, workers, chunk_size, weighted=False)
+
+
+def all_pairs_shortest_paths(graph, workers=None, weighted=True, chunk_size=16):
+    """Yield (source, SearchResult) for every vertex of graph, using Dijkstra
+    when weighted is set and BFS hop counts otherwise, computed in parallel
+    like parallel_bfs."""
+    yield from _run(graph, None, workers, chunk_size, weighted)  # every vertex of the frozen graph
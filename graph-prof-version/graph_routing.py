@@ -0,0 +1,128 @@
+from array import array
+from heapq import heappop, heappush
+from math import inf
+
+from main import to_csr
+
+
+def _lengths(weights):
+    """Return CSR weights as numbers, missing ones counting as 1, or None
+    for an unweighted graph."""
+    if weights is None or isinstance(weights, (array, memoryview)):
+        return weights
+    return array('d', (1 if w is None else w for w in weights))
+
+
+class PathQuery:
+    """Point-to-point shortest-path engine for repeated s-t queries.
+
+    The graph is frozen into CSR form once, so the forward search reads the
+    outgoing arrays and the reverse search of bidirectional Dijkstra reads
+    the incoming ones. Distances, parents and the "visited" marks live in
+    arrays allocated once per engine; every query bumps a stamp instead of
+    clearing them, so a query only touches the vertices it explores. Call
+    refresh() after mutating the graph. Missing weights count as 1."""
+
+    def __init__(self, graph):
+        self._graph = graph
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the graph and reallocate the workspace for its current size."""
+        csr = self._csr = to_csr(self._graph)
+        forward = _lengths(csr._weights)
+        self._lengths = (forward, forward if csr._in_weights is csr._weights else _lengths(csr._in_weights))
+        if self._lengths[0] is not None and min(self._lengths[0], default=0) < 0:
+            raise ValueError("shortest-path queries require non-negative weights")
+        n = csr.vertex_count()
+        self._distance = (array('d', [inf]) * n, array('d', [inf]) * n)
+        self._parent = (array('q', [-1]) * n, array('q', [-1]) * n)
+        self._seen = (array('q', [0]) * n, array('q', [0]) * n)
+        self._stamp = 0
+
+    def _adjacency(self, forward):
+        csr = self._csr
+        if forward:
+            return csr._offsets, csr._targets, self._lengths[0]
+        return csr._in_offsets, csr._in_targets, self._lengths[1]
+
+    def _path(self, meet):
+        """Walk the forward parents back to the source and the backward
+        parents on to the target."""
+        path = []
+        i = meet
+        while i >= 0:
+            path.append(i)
+            i = self._parent[0][i]
+        path.reverse()
+        i = self._parent[1][meet]
+        while i >= 0:
+            path.append(i)
+            i = self._parent[1][i]
+        return [self._csr.vertex_at(i) for i in path]
+
+    def bidirectional_dijkstra(self, source, target):
+        """Return (distance, path) from source to target, or (inf, None) if
+        target is unreachable. Searches alternate from both ends and stop as
+        soon as the two frontiers cannot improve the best meeting point."""
+        s, t = self._csr.index(source), self._csr.index(target)
+        self._stamp += 1
+        stamp = self._stamp
+        distance, parent, seen = self._distance, self._parent, self._seen
+        heaps = ([(0, s)], [(0, t)])
+        for side, i in ((0, s), (1, t)):
+            distance[side][i] = 0
+            parent[side][i] = -1
+            seen[side][i] = stamp
+        best, meet = (0, s) if s == t else (inf, -1)
+        adjacency = (self._adjacency(True), self._adjacency(False))
+        while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            other = 1 - side
+            d, i = heappop(heaps[side])
+            dist, par, mark = distance[side], parent[side], seen[side]
+            if d > dist[i]:  # stale entry
+                continue
+            offsets, targets, weights = adjacency[side]
+            for k in range(offsets[i], offsets[i + 1]):
+                j = targets[k]
+                nd = d + (1 if weights is None else weights[k])
+                if mark[j] != stamp or nd < dist[j]:
+                    mark[j] = stamp
+                    dist[j] = nd
+                    par[j] = i
+                    heappush(heaps[side], (nd, j))
+                    if seen[other][j] == stamp and nd + distance[other][j] < best:
+                        best, meet = nd + distance[other][j], j
+        if meet < 0:
+            return inf, None
+        return best, self._path(meet)
+
+    def astar(self, source, target, heuristic=None):
+        """Return (distance, path) from source to target, or (inf, None),
+        using A*. heuristic(vertex, target) must never overestimate the
+        remaining distance; without one this is Dijkstra stopped at target."""
+        s, t = self._csr.index(source), self._csr.index(target)
+        vertices = self._csr.vertices()
+        self._stamp += 1
+        stamp = self._stamp
+        dist, par, mark = self._distance[0], self._parent[0], self._seen[0]
+        self._parent[1][t] = -1  # _path continues from the target through the backward parents
+        dist[s], par[s], mark[s] = 0, -1, stamp
+        heap = [(heuristic(source, target) if heuristic else 0, 0, s)]
+        offsets, targets, weights = self._adjacency(True)
+        while heap:
+            _, d, i = heappop(heap)
+            if i == t:
+                return d, self._path(t)
+            if d > dist[i]:  # stale entry
+                continue
+            for k in range(offsets[i], offsets[i + 1]):
+                j = targets[k]
+                nd = d + (1 if weights is None else weights[k])
+                if mark[j] != stamp or nd < dist[j]:
+                    mark[j] = stamp
+                    dist[j] = nd
+                    par[j] = i
+                    heappush(heap, (nd + (heuristic(vertices[j], target) if heuristic else 0), nd, j))
+        return inf, None
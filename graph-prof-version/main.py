@@ -1,4 +1,12 @@
 from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Sequence
+from functools import cached_property
+from heapq import nlargest
+from itertools import compress
+from operator import itemgetter
 
 
 class GraphADT(ABC):
@@ -71,6 +79,105 @@ class GraphADT(ABC):
         """Remove an edge from the graph."""
         ...
 
+    _listeners = ()
+    _version = 0  # bumped on every mutation
+    _edge_cache = None  # [version, edges tuple, edges set or None], see EdgeView
+    _loops_listed_twice = False  # True if neighbours() reports an undirected self-loop twice
+    _keeps_incoming = False  # True if neighbours(v, outgoing=False) reads an index instead of scanning
+
+    def is_directed(self):
+        """Return True if the graph was declared as directed."""
+        return self._directed
+
+    def subscribe(self, listener):
+        """Call listener(event, *args) after every mutation of the graph, with
+        event one of 'insert_vertex' (vertex), 'insert_edge' (vertex1, vertex2,
+        weight), 'remove_edge' (vertex1, vertex2) or 'remove_vertex' (vertex,
+        tuple of the vertices it was adjacent to)."""
+        self._listeners = (*self._listeners, listener)
+
+    def unsubscribe(self, listener):
+        self._listeners = tuple(x for x in self._listeners if x is not listener)
+
+    def _notify(self, event, *args):
+        self._version += 1
+        for listener in self._listeners:
+            listener(event, *args)
+
+    def _adjacent_vertices(self, vertex):
+        """Return the other vertices joined to vertex by an edge in either direction."""
+        adjacent = {u for u, _ in self.neighbours(vertex)}
+        if self.is_directed():
+            adjacent.update(u for u, _ in self.neighbours(vertex, outgoing=False))
+        adjacent.discard(vertex)
+        return tuple(adjacent)
+
+    def neighbours(self, vertex, outgoing=True):
+        """Return an iteration of (vertex, weight) pairs adjacent to vertex,
+        following outgoing edges by default and incoming edges if the
+        optional parameter is set to False."""
+        for edge in self.incident_edges(vertex, outgoing):
+            if isinstance(edge, Edge):
+                yield edge.opposite(vertex), edge.weight()
+            else:  # plain (u, v) tuples carry no weight
+                u, v = edge
+                yield (v if u is vertex else u), None
+
+    def freeze(self):
+        """Return a read-only CSRGraph copy of this graph."""
+        return to_csr(self)
+
+    def degree_histogram(self, outgoing=True):
+        """Return a Counter mapping each degree to the number of vertices having it."""
+        return Counter(self.degree(v, outgoing) for v in self.vertices())
+
+    def top_k_degree(self, k, outgoing=True):
+        """Return the k (vertex, degree) pairs with the highest degree, highest first."""
+        return nlargest(k, ((v, self.degree(v, outgoing)) for v in self.vertices()), key=itemgetter(1))
+
+    def save(self, path):
+        """Write the graph to path in the binary format of graph_io."""
+        from graph_io import save
+        save(self, path)
+
+    def induced_subgraph(self, vertices):
+        """Return a read-only SubgraphView of the given vertices of this graph
+        and the edges among them."""
+        return SubgraphView(self, vertices)
+
+    def k_hop(self, vertex, k, outgoing=True):
+        """Return a read-only SubgraphView induced by the vertices reachable
+        from vertex in at most k steps, following outgoing edges by default
+        and incoming edges if outgoing is False."""
+        members = {vertex: None}
+        frontier = [vertex]
+        for _ in range(k):
+            reached = []
+            for v in frontier:
+                for u, _ in self.neighbours(v, outgoing):
+                    if u not in members:
+                        members[u] = None
+                        reached.append(u)
+            if not reached:
+                break
+            frontier = reached
+        return SubgraphView(self, members)
+
+    def bulk_insert_edges(self, edges):
+        """Insert every (vertex1, vertex2) or (vertex1, vertex2, weight) item
+        of edges, adding the vertices that are not in the graph yet, and
+        return the number of edges inserted."""
+        known = set(self.vertices())
+        count = 0
+        for item in edges:
+            for vertex in item[:2]:
+                if vertex not in known:
+                    self.insert_vertex(vertex)
+                    known.add(vertex)
+            self.insert_edge(item[0], item[1], item[2] if len(item) > 2 else None)
+            count += 1
+        return count
+
 
 class Vertex:
     __slots__ = '_value'
@@ -120,29 +227,101 @@ class Edge:
         return f"Edge({self._origin.value()}, {self._destination.value()}, {self._weight})"
 
 
+class EdgeView:
+    """Lazy, sized view of a graph's edges, as returned by edges().
+
+    Creating the view allocates nothing. The first scan after a mutation
+    materializes the edges produced by the graph's _scan_edges() into a tuple
+    stamped with the graph's version; every later scan, from this or any
+    other view of the graph, reuses it until the graph changes again."""
+    __slots__ = '_graph'
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def _snapshot(self):
+        graph = self._graph
+        cache = graph._edge_cache
+        if cache is None or cache[0] != graph._version:
+            cache = graph._edge_cache = [graph._version, tuple(graph._scan_edges()), None]
+        return cache
+
+    def __len__(self):
+        return self._graph.edge_count()
+
+    def __iter__(self):
+        return iter(self._snapshot()[1])
+
+    def __contains__(self, edge):
+        cache = self._snapshot()
+        if cache[2] is None:
+            cache[2] = set(cache[1])
+        return edge in cache[2]
+
+
 # Todo: implementar grafos mistos (mixed graphs), por hora o grafo é dirigido ou não dirigido
 
 # implementações
 class EdgeListGraph(GraphADT):
-
-    def __init__(self, directed=False):
-        self._vertices = []
-        self._edges = []
+    """Keeps every edge in one insertion-ordered collection. Unless indexed is
+    set to False, it also keeps for each vertex the lists of edges leaving and
+    entering it, and for each (origin, destination) pair the list of parallel
+    edges between them, so get_edge, degree, incident_edges and remove_vertex
+    do not have to scan every edge of the graph.
+
+    Vertices are matched by Vertex.__eq__, that is by value. Vertex hashes by
+    identity, so the vertex set and the indexes are keyed by _key(vertex),
+    and edges always hold the vertex object stored in the graph."""
+    _loops_listed_twice = True  # an undirected edge is stored once per direction
+
+    def __init__(self, directed=False, indexed=True):
+        self._vertices = {}  # _key(vertex) -> vertex, in insertion order
+        self._edges = {}  # insertion-ordered set of edges
         self._directed = directed
+        self._indexed = indexed
+        self._keeps_incoming = indexed
+        self._outgoing = {}  # _key(vertex) -> edges leaving it
+        self._incoming = {}  # _key(vertex) -> edges entering it
+        self._pairs = {}  # (_key(origin), _key(destination)) -> parallel edges
+        self._lists = {}  # 'vertices' or 'edges' -> (version, list), see _listed
+
+    @staticmethod
+    def _key(vertex):
+        """Return the dict key of vertex: equal vertices get equal keys."""
+        if isinstance(vertex, Vertex):
+            try:
+                hash(vertex._value)
+            except TypeError:  # unhashable value, only the vertex itself matches
+                return vertex
+            return Vertex, vertex._value
+        return vertex
+
+    def _listed(self, name, items):
+        """Return items as a list, built again only after the graph changed."""
+        cached = self._lists.get(name)
+        if cached is None or cached[0] != self._version:
+            cached = self._lists[name] = (self._version, list(items))
+        return cached[1]
 
     def vertex_count(self):
         return len(self._vertices)
 
     def vertices(self):
-        return self._vertices
+        return self._listed('vertices', self._vertices.values())
 
     def edge_count(self):
         return len(self._edges)
 
     def edges(self):
-        return self._edges
+        return self._listed('edges', self._edges)
 
     def get_edge(self, vertex1, vertex2):
+        if self._indexed:
+            key1, key2 = self._key(vertex1), self._key(vertex2)
+            res = list(self._pairs.get((key1, key2), ()))
+            if not self._directed and key1 != key2:
+                res.extend(self._pairs.get((key2, key1), ()))
+            return res
         res = []
         for edge in self._edges:
             if self._directed:
@@ -154,13 +333,19 @@ class EdgeListGraph(GraphADT):
         return res
 
     def degree(self, vertex, outgoing=True):
+        if self._indexed:
+            index = self._incoming if self._directed and not outgoing else self._outgoing
+            return len(index.get(self._key(vertex), ()))
         if self._directed and not outgoing:  # incoming edges
             return sum(1 for edge in self._edges if edge.endpoints()[1] == vertex)
         else: # outgoing edges in a directed graph or all edges in an undirected graph
             return sum(1 for edge in self._edges if edge.endpoints()[0] == vertex)
 
     def incident_edges(self, vertex, outgoing=True):
-        if self._directed and not outgoing:  # incoming edges
+        if self._indexed:
+            index = self._incoming if self._directed and not outgoing else self._outgoing
+            yield from index.get(self._key(vertex), ())
+        elif self._directed and not outgoing:  # incoming edges
             for edge in self._edges:
                 if edge.endpoints()[1] == vertex:
                     yield edge
@@ -169,46 +354,354 @@ class EdgeListGraph(GraphADT):
                 if edge.endpoints()[0] == vertex:
                     yield edge
 
+    def neighbours(self, vertex, outgoing=True):
+        # the origin of an incident edge is vertex itself, except for incoming edges
+        side = 0 if self._directed and not outgoing else 1
+        for edge in self.incident_edges(vertex, outgoing):
+            yield edge.endpoints()[side], edge.weight()
+
     def insert_vertex(self, vertex):
-        self._vertices.append(vertex)
+        key = self._key(vertex)
+        if key not in self._vertices:
+            self._vertices[key] = vertex
+            self._notify('insert_vertex', vertex)
 
     def insert_vertex_array(self, vertex: list[Vertex]):
         for v in vertex:
             self.insert_vertex(v)
 
     def insert_edge(self, vertex1, vertex2, weight=None):
-        edge = Edge(vertex1, vertex2, weight)
-        self._edges.append(edge)
-        if not self._directed:
-            self._edges.append(Edge(vertex2, vertex1, weight))
+        self.insert_vertex(vertex1)
+        self.insert_vertex(vertex2)
+        # an equal vertex may already be stored; the edge refers to that one
+        vertex1, vertex2 = self._vertices[self._key(vertex1)], self._vertices[self._key(vertex2)]
 
-        if not vertex1 in self._vertices:
-            self._vertices.append(vertex1)
-        if not vertex2 in self._vertices:
-            self._vertices.append(vertex2)
+        self._add_edge(Edge(vertex1, vertex2, weight))
+        if not self._directed:
+            self._add_edge(Edge(vertex2, vertex1, weight))
+        self._notify('insert_edge', vertex1, vertex2, weight)
+
+    def bulk_insert_edges(self, edges):
+        if self._listeners:  # listeners expect one event per vertex and edge
+            return super().bulk_insert_edges(edges)
+        self._version += 1
+        vertices, all_edges, directed, indexed = self._vertices, self._edges, self._directed, self._indexed
+        outgoing, incoming, pairs, key = self._outgoing, self._incoming, self._pairs, self._key
+
+        def endpoint(vertex):
+            k = key(vertex)
+            vertex = vertices.setdefault(k, vertex)
+            if not indexed:
+                return vertex, k, None, None
+            return vertex, k, outgoing.setdefault(k, []), incoming.setdefault(k, [])
+
+        # the work of _key and _add_edge is done once per endpoint object, not once per edge copy
+        seen = {}  # endpoint object -> (stored vertex, key, edges leaving it, edges entering it)
+        count = 0
+        for item in edges:
+            u_entry = seen.get(item[0])
+            if u_entry is None:
+                u_entry = seen[item[0]] = endpoint(item[0])
+            v_entry = seen.get(item[1])
+            if v_entry is None:
+                v_entry = seen[item[1]] = endpoint(item[1])
+            u, ku, u_out, u_in = u_entry
+            v, kv, v_out, v_in = v_entry
+            weight = item[2] if len(item) > 2 else None
+            edge = Edge(u, v, weight)
+            all_edges[edge] = None
+            if indexed:
+                u_out.append(edge)
+                v_in.append(edge)
+                pairs.setdefault((ku, kv), []).append(edge)
+            if not directed:
+                edge = Edge(v, u, weight)
+                all_edges[edge] = None
+                if indexed:
+                    v_out.append(edge)
+                    u_in.append(edge)
+                    pairs.setdefault((kv, ku), []).append(edge)
+            count += 1
+        return count
+
+    def _add_edge(self, edge):
+        self._edges[edge] = None
+        if self._indexed:
+            u, v = map(self._key, edge.endpoints())
+            self._outgoing.setdefault(u, []).append(edge)
+            self._incoming.setdefault(v, []).append(edge)
+            self._pairs.setdefault((u, v), []).append(edge)
+
+    def _discard_edge(self, edge):
+        del self._edges[edge]
+        if self._indexed:
+            u, v = map(self._key, edge.endpoints())
+            self._outgoing[u].remove(edge)
+            self._incoming[v].remove(edge)
+            parallel = self._pairs[u, v]
+            parallel.remove(edge)
+            if not parallel:
+                del self._pairs[u, v]
 
     def remove_vertex(self, vertex):
+        key = self._key(vertex)
+        if key not in self._vertices:
+            return
+        vertex = self._vertices[key]
+        adjacent = self._adjacent_vertices(vertex) if self._listeners else ()
         # Remove all edges directed to/from this vertex
-        self._edges = [edge for edge in self._edges if edge.endpoints()[0] != vertex and edge.endpoints()[1] != vertex]
-        if vertex in self._vertices:
-            self._vertices.remove(vertex)
+        if self._indexed:
+            for edge in self._outgoing.pop(key, ()):
+                del self._edges[edge]
+                destination = self._key(edge.endpoints()[1])
+                self._pairs.pop((key, destination), None)
+                if destination != key:
+                    self._incoming[destination].remove(edge)
+            for edge in self._incoming.pop(key, ()):
+                if edge in self._edges:  # self-loops are already gone
+                    del self._edges[edge]
+                    origin = self._key(edge.endpoints()[0])
+                    self._pairs.pop((origin, key), None)
+                    self._outgoing[origin].remove(edge)
+        else:
+            self._edges = {edge: None for edge in self._edges
+                           if edge.endpoints()[0] != vertex and edge.endpoints()[1] != vertex}
+        del self._vertices[key]
+        self._notify('remove_vertex', vertex, adjacent)
 
     def remove_edge(self, edge):
         if self._directed:
-            self._edges.remove(edge)
+            self._discard_edge(edge)
+            self._notify('remove_edge', *edge.endpoints())
             return
 
-        edges = [e for e in self._edges if
-                 e.endpoints()[1] == edge.endpoints()[0] and e.endpoints()[0] == edge.endpoints()[1]
-                 or e == edge]
+        if self._indexed:
+            u, v = map(self._key, edge.endpoints())
+            edges = dict.fromkeys([edge, *self._pairs.get((v, u), ())])
+        else:
+            edges = [e for e in self._edges if
+                     e.endpoints()[1] == edge.endpoints()[0] and e.endpoints()[0] == edge.endpoints()[1]
+                     or e == edge]
         for e in edges:
-            self._edges.remove(e)
+            self._discard_edge(e)
+        self._notify('remove_edge', *edge.endpoints())
+
+
+class EdgeHandle:
+    """Lightweight view of an edge stored in the columns of a
+    CompactEdgeListGraph. It only holds the graph, the integer handle of the
+    edge and the generation of that handle when the view was made, so a view
+    of a removed edge is not mistaken for a later edge reusing its handle;
+    endpoints and weight are read from the columns on demand."""
+    __slots__ = '_graph', '_handle', '_generation'
+
+    def __init__(self, graph, handle):
+        self._graph = graph
+        self._handle = handle
+        self._generation = graph._generations[handle]
+
+    def handle(self):
+        return self._handle
+
+    def endpoints(self):
+        graph = self._graph
+        return graph._vertices[graph._origins[self._handle]], graph._vertices[graph._destinations[self._handle]]
+
+    def opposite(self, v):
+        u, w = self.endpoints()
+        return w if v is u else u
+
+    def weight(self):
+        return self._graph._weight(self._handle)
+
+    def __eq__(self, other):
+        return (isinstance(other, EdgeHandle) and self._graph is other._graph
+                and self._handle == other._handle and self._generation == other._generation)
+
+    def __hash__(self):
+        return hash((id(self._graph), self._handle, self._generation))
+
+    def __str__(self):
+        u, v = self.endpoints()
+        return f"Edge({u.value()}, {v.value()}, {self.weight()})"
+
+
+class CompactEdgeListGraph(GraphADT):
+    """Edge list for very large graphs that stores no Python object per edge.
+
+    Vertices get integer ids and every edge is an integer handle into three
+    parallel columns: origin ids and destination ids in array('q') and
+    weights in array('d'). Each vertex keeps array('q') lists of the handles
+    of its outgoing and incoming edges. An undirected edge is stored once
+    and listed under both endpoints. EdgeHandle views are only created when
+    a caller asks for edges; neighbours() never creates them. Weights must
+    be numbers or None (stored as NaN). Handles of removed edges are reused."""
+    _keeps_incoming = True
+
+    def __init__(self, directed=False):
+        self._directed = directed
+        self._vertices = []  # id -> vertex, None once removed
+        self._index = {}  # vertex -> id
+        self._origins = array('q')
+        self._destinations = array('q')
+        self._weights = array('d')
+        self._alive = bytearray()  # 1 for handles holding an edge
+        self._generations = array('q')  # bumped each time a handle's edge is removed
+        self._free = array('q')  # handles of removed edges
+        self._outgoing = []  # id -> handles of edges leaving it
+        # only keep a second list of handles for directed graph; use alias for undirected
+        self._incoming = [] if directed else self._outgoing
+        self._edge_count = 0
+
+    def _weight(self, handle):
+        weight = self._weights[handle]
+        return None if weight != weight else weight  # NaN marks a missing weight
+
+    def vertex_count(self):
+        return len(self._index)
+
+    def vertices(self):
+        return self._index.keys()
+
+    def edge_count(self):
+        return self._edge_count
+
+    def edges(self):
+        for handle in compress(range(len(self._alive)), self._alive):
+            yield EdgeHandle(self, handle)
+
+    def get_edge(self, vertex1, vertex2):
+        i, j = self._index.get(vertex1), self._index.get(vertex2)
+        if i is None or j is None:
+            return None
+        # scan the shorter of the two handle lists
+        if len(self._outgoing[i]) <= len(self._incoming[j]):
+            for handle in self._outgoing[i]:
+                if self._opposite_id(handle, i) == j:
+                    return EdgeHandle(self, handle)
+        else:
+            for handle in self._incoming[j]:
+                if self._opposite_id(handle, j) == i:
+                    return EdgeHandle(self, handle)
+        return None
+
+    def _opposite_id(self, handle, i):
+        origin = self._origins[handle]
+        return self._destinations[handle] if origin == i else origin
+
+    def degree(self, vertex, outgoing=True):
+        handles = self._outgoing if outgoing else self._incoming
+        return len(handles[self._index[vertex]])
+
+    def incident_edges(self, vertex, outgoing=True):
+        handles = self._outgoing if outgoing else self._incoming
+        for handle in handles[self._index[vertex]]:
+            yield EdgeHandle(self, handle)
+
+    def neighbours(self, vertex, outgoing=True):
+        handles = self._outgoing if outgoing else self._incoming
+        i = self._index[vertex]
+        for handle in handles[i]:
+            yield self._vertices[self._opposite_id(handle, i)], self._weight(handle)
+
+    def insert_vertex(self, vertex):
+        if vertex not in self._index:
+            self._index[vertex] = len(self._vertices)
+            self._vertices.append(vertex)
+            self._outgoing.append(array('q'))
+            if self._directed:
+                self._incoming.append(array('q'))
+            self._notify('insert_vertex', vertex)
+
+    def insert_edge(self, vertex1, vertex2, weight=None):
+        value = self._as_weight(weight)  # fail before any vertex or column is touched
+        self.insert_vertex(vertex1)
+        self.insert_vertex(vertex2)
+        handle = self._add_edge(self._index[vertex1], self._index[vertex2], value)
+        self._notify('insert_edge', vertex1, vertex2, weight)
+        return EdgeHandle(self, handle)
+
+    @staticmethod
+    def _as_weight(weight):
+        """Return weight as stored in the weight column, raising TypeError or
+        ValueError for a weight that is neither a number nor None."""
+        return float('nan') if weight is None else float(weight)
+
+    def _add_edge(self, i, j, weight):
+        """Store an edge whose weight already went through _as_weight."""
+        if self._free:
+            handle = self._free.pop()
+            self._origins[handle], self._destinations[handle], self._weights[handle] = i, j, weight
+            self._alive[handle] = 1
+        else:
+            handle = len(self._alive)
+            self._origins.append(i)
+            self._destinations.append(j)
+            self._weights.append(weight)
+            self._alive.append(1)
+            self._generations.append(0)
+        self._outgoing[i].append(handle)
+        if self._directed or i != j:
+            self._incoming[j].append(handle)
+        self._edge_count += 1
+        return handle
+
+    def bulk_insert_edges(self, edges):
+        if self._listeners:  # listeners expect one event per vertex and edge
+            return super().bulk_insert_edges(edges)
+        self._version += 1
+        index, insert_vertex, add_edge, as_weight = self._index, self.insert_vertex, self._add_edge, self._as_weight
+        count = 0
+        for item in edges:
+            u, v = item[0], item[1]
+            weight = as_weight(item[2] if len(item) > 2 else None)
+            if u not in index:
+                insert_vertex(u)
+            if v not in index:
+                insert_vertex(v)
+            add_edge(index[u], index[v], weight)
+            count += 1
+        return count
+
+    def _discard_edge(self, handle):
+        i, j = self._origins[handle], self._destinations[handle]
+        self._outgoing[i].remove(handle)
+        if self._directed or i != j:
+            self._incoming[j].remove(handle)
+        self._alive[handle] = 0
+        self._generations[handle] += 1
+        self._free.append(handle)
+        self._edge_count -= 1
+
+    def remove_vertex(self, vertex):
+        if vertex not in self._index:
+            return
+        adjacent = self._adjacent_vertices(vertex) if self._listeners else ()
+        i = self._index.pop(vertex)
+        for handle in self._outgoing[i].tolist():
+            self._discard_edge(handle)
+        for handle in self._incoming[i].tolist():  # empty by now when undirected
+            self._discard_edge(handle)
+        self._vertices[i] = None
+        self._notify('remove_vertex', vertex, adjacent)
+
+    def remove_edge(self, edge):
+        handle = edge.handle()
+        # a view from another graph, or of an edge whose handle was reused, names no edge here
+        if edge._graph is self and self._alive[handle] and self._generations[handle] == edge._generation:
+            u, v = edge.endpoints()
+            self._discard_edge(handle)
+            self._notify('remove_edge', u, v)
 
 
 class AdjacencyListGraph(GraphADT):
+    _loops_listed_twice = True
+
     def __init__(self, directed=False):
         self._adjacency_list = {}
         self._directed = directed
+        self._edge_total = 0  # entries over all adjacency lists
+        self._in_degree = {}  # vertex -> entries pointing at it
 
     def vertex_count(self):
         return len(self._adjacency_list)
@@ -217,16 +710,24 @@ class AdjacencyListGraph(GraphADT):
         return self._adjacency_list.keys()
 
     def edge_count(self):
-        total = sum(len(edges) for edges in self._adjacency_list.values())
-        return total if self._directed else total // 2
+        return self._edge_total if self._directed else self._edge_total // 2
 
     def edges(self):
-        result = set()
-        for u, edges in self._adjacency_list.items():
-            for v in edges:
-                if self._directed or (v, u) not in result:
-                    result.add((u, v))
-        return result
+        return EdgeView(self)
+
+    def _scan_edges(self):
+        directed = self._directed
+        done = set()  # vertices whose undirected edges were all reported
+        for u, targets in self._adjacency_list.items():
+            loops = 0
+            for v in targets:
+                if v is u and not directed:
+                    loops += 1
+                    if not loops % 2:  # an undirected self-loop is listed twice
+                        continue
+                if directed or v not in done:
+                    yield (u, v)
+            done.add(u)
 
     def get_edge(self, u, v):
         if u in self._adjacency_list and v in self._adjacency_list[u]:
@@ -237,7 +738,7 @@ class AdjacencyListGraph(GraphADT):
         if outgoing:
             return len(self._adjacency_list.get(v, []))
         else:
-            return sum(1 for edges in self._adjacency_list.values() if v in edges)
+            return self._in_degree.get(v, 0)
 
     def incident_edges(self, v, outgoing=True):
         if outgoing:
@@ -251,6 +752,8 @@ class AdjacencyListGraph(GraphADT):
     def insert_vertex(self, x=None):
         if x not in self._adjacency_list:
             self._adjacency_list[x] = []
+            self._in_degree[x] = 0
+            self._notify('insert_vertex', x)
 
     def insert_edge(self, u, v, weight=None):
         if u not in self._adjacency_list:
@@ -258,30 +761,70 @@ class AdjacencyListGraph(GraphADT):
         if v not in self._adjacency_list:
             self.insert_vertex(v)
         self._adjacency_list[u].append(v)
+        self._in_degree[v] += 1
+        self._edge_total += 1
         if not self._directed:
             self._adjacency_list[v].append(u)
+            self._in_degree[u] += 1
+            self._edge_total += 1
+        self._notify('insert_edge', u, v, weight)
+
+    def bulk_insert_edges(self, edges):
+        if self._listeners:  # listeners expect one event per vertex and edge
+            return super().bulk_insert_edges(edges)
+        self._version += 1
+        adjacency, in_degree, directed = self._adjacency_list, self._in_degree, self._directed
+        count = 0
+        for item in edges:
+            u, v = item[0], item[1]
+            if u not in adjacency:
+                self.insert_vertex(u)
+            if v not in adjacency:
+                self.insert_vertex(v)
+            adjacency[u].append(v)
+            in_degree[v] += 1
+            if not directed:
+                adjacency[v].append(u)
+                in_degree[u] += 1
+            count += 1
+        self._edge_total += count if directed else 2 * count
+        return count
 
     def remove_vertex(self, vertex):
         if vertex in self._adjacency_list:
-            del self._adjacency_list[vertex]
-            for edges in self._adjacency_list.values():
+            adjacent = self._adjacent_vertices(vertex) if self._listeners else ()
+            removed = self._adjacency_list.pop(vertex)
+            self._edge_total -= len(removed)
+            for v in removed:
+                self._in_degree[v] -= 1
+            del self._in_degree[vertex]
+            for u, edges in self._adjacency_list.items():
                 if vertex in edges:
                     edges.remove(vertex)
+                    self._edge_total -= 1
+            self._notify('remove_vertex', vertex, adjacent)
 
     def remove_edge(self, edge):
         u, v = edge
         if u in self._adjacency_list and v in self._adjacency_list[u]:
             self._adjacency_list[u].remove(v)
+            self._in_degree[v] -= 1
+            self._edge_total -= 1
             if not self._directed and u in self._adjacency_list[v]:
                 self._adjacency_list[v].remove(u)
+                self._in_degree[u] -= 1
+                self._edge_total -= 1
+            self._notify('remove_edge', u, v)
 
 
 class AdjacencyMapGraph(GraphADT):
+    _keeps_incoming = True
 
     def __init__(self, directed=False):
         self._outgoing = {}
         # only create a second map for directed graph; use alias for undirected
         self._incoming = {} if directed else self._outgoing
+        self._edge_count = 0
 
     def is_directed(self):
         return self._incoming is not self._outgoing
@@ -293,14 +836,17 @@ class AdjacencyMapGraph(GraphADT):
         return self._outgoing.keys()
 
     def edge_count(self):
-        total = sum(len(self._outgoing[v]) for v in self._outgoing)
-        return total if self.is_directed() else total // 2
+        return self._edge_count
 
     def edges(self):
-        result = set()
-        for secondary_map in self._outgoing.values():
-            result.update(secondary_map.values())  # add edges to a resulting set
-        return result
+        return EdgeView(self)
+
+    def _scan_edges(self):
+        directed = self.is_directed()
+        for u, secondary_map in self._outgoing.items():
+            for edge in secondary_map.values():
+                if directed or edge._origin is u:  # undirected edges are stored under both endpoints
+                    yield edge
 
     def get_edge(self, u, v):
         return self._outgoing[u].get(v)  # returns None if v not adjacent
@@ -314,32 +860,72 @@ class AdjacencyMapGraph(GraphADT):
         for edge in adj[v].values():
             yield edge
 
+    def neighbours(self, vertex, outgoing=True):
+        adj = self._outgoing if outgoing else self._incoming
+        for v, edge in adj[vertex].items():
+            yield v, edge.weight()
+
     def insert_vertex(self, vertex):
+        if vertex in self._outgoing:
+            return
         self._outgoing[vertex] = {}
         if self.is_directed():
             self._incoming[vertex] = {}  # need a distinct map for incoming edges
+        self._notify('insert_vertex', vertex)
 
     def insert_edge(self, u, v, weight=None):
         edge = Edge(u, v, weight)
+        if v not in self._outgoing[u]:
+            self._edge_count += 1
         self._outgoing[u][v] = edge
         self._incoming[v][u] = edge
+        self._notify('insert_edge', u, v, weight)
+
+    def bulk_insert_edges(self, edges):
+        if self._listeners:  # listeners expect one event per vertex and edge
+            return super().bulk_insert_edges(edges)
+        self._version += 1
+        outgoing, incoming = self._outgoing, self._incoming
+        count = 0
+        for item in edges:
+            u, v = item[0], item[1]
+            if u not in outgoing:
+                self.insert_vertex(u)
+            if v not in outgoing:
+                self.insert_vertex(v)
+            edge = Edge(u, v, item[2] if len(item) > 2 else None)
+            if v not in outgoing[u]:
+                self._edge_count += 1
+            outgoing[u][v] = edge
+            incoming[v][u] = edge
+            count += 1
+        return count
 
     def remove_vertex(self, vertex):
+        adjacent = self._adjacent_vertices(vertex) if self._listeners else ()
+        self._edge_count -= len(self._outgoing[vertex])
+        if self.is_directed():  # a self-loop is both outgoing and incoming
+            self._edge_count -= len(self._incoming[vertex]) - (vertex in self._outgoing[vertex])
         # Remove all edges incoming to this vertex
         for u in list(self._incoming[vertex].keys()):
             del self._outgoing[u][vertex]
-        # Remove all edges outgoing from this vertex
-        for v in list(self._outgoing[vertex].keys()):
-            del self._incoming[v][vertex]
+        # Remove all edges outgoing from this vertex (already gone if undirected)
+        if self.is_directed():
+            for v in list(self._outgoing[vertex].keys()):
+                del self._incoming[v][vertex]
         # Remove the vertex itself
         del self._outgoing[vertex]
         if self.is_directed():
             del self._incoming[vertex]
+        self._notify('remove_vertex', vertex, adjacent)
 
     def remove_edge(self, edge):
         u, v = edge.endpoints()
         del self._outgoing[u][v]
-        del self._incoming[v][u]
+        if self.is_directed() or u is not v:  # an undirected self-loop is a single map entry
+            del self._incoming[v][u]
+        self._edge_count -= 1
+        self._notify('remove_edge', u, v)
 
 
 class AdjacencyMatrixGraph(GraphADT):
@@ -348,6 +934,10 @@ class AdjacencyMatrixGraph(GraphADT):
         self._directed = directed
         self._vertices = []  # List of vertices
         self._matrix = []  # Adjacency matrix initialized as empty
+        self._index = {}  # vertex -> row/column
+        self._out_degree = []  # non-empty cells per row
+        self._in_degree = []  # non-empty cells per column
+        self._edge_count = 0
 
     def vertex_count(self):
         return len(self._vertices)
@@ -356,34 +946,31 @@ class AdjacencyMatrixGraph(GraphADT):
         return self._vertices
 
     def edge_count(self):
-        count = 0
-        for row in self._matrix:
-            count += sum(1 for weight in row if weight is not None)
-        return count if self._directed else count // 2
+        return self._edge_count
 
     def edges(self):
-        result = set()
+        return EdgeView(self)
+
+    def _scan_edges(self):
+        vertices = self._vertices
         for i, row in enumerate(self._matrix):
-            for j, weight in enumerate(row):
-                if weight is not None:
-                    result.add((self._vertices[i], self._vertices[j], weight))
-        return result
+            # an undirected edge fills cells (i, j) and (j, i); report the upper one
+            for j in range(0 if self._directed else i, len(row)):
+                if row[j] is not None:
+                    yield (vertices[i], vertices[j], row[j])
 
     def get_edge(self, vertex1, vertex2):
-        i = self._vertices.index(vertex1)
-        j = self._vertices.index(vertex2)
+        i = self._index[vertex1]
+        j = self._index[vertex2]
         weight = self._matrix[i][j]
         return Edge(vertex1, vertex2, weight) if weight is not None else None
 
     def degree(self, vertex, outgoing=True):
-        index = self._vertices.index(vertex)
-        if outgoing:
-            return sum(1 for weight in self._matrix[index] if weight is not None)
-        else:
-            return sum(1 for row in self._matrix if row[index] is not None)
+        index = self._index[vertex]
+        return self._out_degree[index] if outgoing else self._in_degree[index]
 
     def incident_edges(self, vertex, outgoing=True):
-        index = self._vertices.index(vertex)
+        index = self._index[vertex]
         if outgoing:
             for j, weight in enumerate(self._matrix[index]):
                 if weight is not None:
@@ -394,37 +981,582 @@ class AdjacencyMatrixGraph(GraphADT):
                     yield Edge(self._vertices[i], vertex, row[index])
 
     def insert_vertex(self, vertex):
-        if vertex not in self._vertices:
+        if vertex not in self._index:
+            self._index[vertex] = len(self._vertices)
             self._vertices.append(vertex)
+            self._out_degree.append(0)
+            self._in_degree.append(0)
             size = len(self._vertices)
             # Expand the matrix
             for row in self._matrix:
                 row.append(None)  # Add a new column
             self._matrix.append([None] * size)  # Add a new row
+            self._notify('insert_vertex', vertex)
 
     def insert_edge(self, vertex1, vertex2, weight=None):
-        i = self._vertices.index(vertex1)
-        j = self._vertices.index(vertex2)
+        i = self._index[vertex1]
+        j = self._index[vertex2]
+        self._set_cell(i, j, weight)
+        if not self._directed and i != j:
+            self._set_cell(j, i, weight)
+        self._notify('insert_edge', vertex1, vertex2, weight)
+
+    def _set_cell(self, i, j, weight):
+        """Store weight in cell (i, j), keeping the degree tables and the edge count in step."""
+        change = (weight is not None) - (self._matrix[i][j] is not None)
         self._matrix[i][j] = weight
-        if not self._directed:
-            self._matrix[j][i] = weight
+        self._out_degree[i] += change
+        self._in_degree[j] += change
+        if self._directed or i <= j:  # an undirected edge is counted by its upper cell
+            self._edge_count += change
+
+    def bulk_insert_edges(self, edges):
+        if self._listeners:  # listeners expect one event per vertex and edge
+            return super().bulk_insert_edges(edges)
+        self._version += 1
+        edges = list(edges)
+        index = self._index
+        new = [v for v in dict.fromkeys(x for item in edges for x in item[:2]) if v not in index]
+        # Expand the matrix once for all the new vertices
+        for v in new:
+            index[v] = len(self._vertices)
+            self._vertices.append(v)
+        for row in self._matrix:
+            row.extend([None] * len(new))
+        self._matrix.extend([None] * len(self._vertices) for _ in new)
+        self._out_degree.extend([0] * len(new))
+        self._in_degree.extend([0] * len(new))
+        set_cell, directed = self._set_cell, self._directed
+        for item in edges:
+            i, j = index[item[0]], index[item[1]]
+            weight = item[2] if len(item) > 2 else None
+            set_cell(i, j, weight)
+            if not directed and i != j:
+                set_cell(j, i, weight)
+        return len(edges)
 
     def remove_vertex(self, vertex):
-        if vertex in self._vertices:
-            index = self._vertices.index(vertex)
+        if vertex in self._index:
+            adjacent = self._adjacent_vertices(vertex) if self._listeners else ()
+            index = self._index.pop(vertex)
+            # Forget the vertex's edges in the degree tables
+            for i in range(len(self._vertices)):
+                if i != index:
+                    if self._matrix[i][index] is not None:
+                        self._out_degree[i] -= 1
+                    if self._matrix[index][i] is not None:
+                        self._in_degree[i] -= 1
+            # the row holds every incident edge of an undirected graph, a self-loop once
+            loop = self._matrix[index][index] is not None
+            incoming = self._in_degree.pop(index)
+            self._edge_count -= self._out_degree.pop(index) + (incoming - loop if self._directed else 0)
             # Remove the vertex from vertices list
             self._vertices.pop(index)
+            for i in range(index, len(self._vertices)):
+                self._index[self._vertices[i]] = i
             # Remove the row corresponding to this vertex
             self._matrix.pop(index)
             # Remove the column corresponding to this vertex from each remaining row
             for row in self._matrix:
                 row.pop(index)
+            self._notify('remove_vertex', vertex, adjacent)
 
     def remove_edge(self, edge):
         u, v = edge.endpoints()
-        if u in self._vertices and v in self._vertices:
-            i = self._vertices.index(u)
-            j = self._vertices.index(v)
-            self._matrix[i][j] = None
+        if u in self._index and v in self._index:
+            i = self._index[u]
+            j = self._index[v]
+            self._set_cell(i, j, None)
             if not self._directed:
-                self._matrix[j][i] = None
+                self._set_cell(j, i, None)
+            self._notify('remove_edge', u, v)
+
+
+class DenseMatrixGraph(GraphADT):
+    """Adjacency matrix for dense graphs with numeric weights.
+
+    Weights live in one flat array (row-major, capacity x capacity) whose
+    capacity doubles when it fills up, and edge presence is tracked by a
+    separate bitmask with one bit per cell, scanned a byte at a time when
+    enumerating edges. Directed graphs keep a second, transposed bitmask for
+    incoming edges. Degrees and the edge count are kept in running tables. Vertices map
+    to matrix slots through a dict; the slots of removed vertices are reused.
+    Edges inserted without a weight are stored with weight 1."""
+
+    def __init__(self, directed=False, typecode='d', capacity=8):
+        self._directed = directed
+        self._typecode = typecode
+        self._capacity = max(8, (capacity + 7) & ~7)  # keep rows a whole number of bytes
+        self._row_bytes = self._capacity >> 3
+        self._weights = self._new_weights(self._capacity)
+        self._mask = bytearray(self._capacity * self._row_bytes)
+        # only create a second mask for directed graph; use alias for undirected
+        self._in_mask = bytearray(len(self._mask)) if directed else self._mask
+        self._index = {}  # vertex -> slot
+        self._slots = []  # slot -> vertex, None for free slots
+        self._free = []
+        self._out_degree = array('q', bytes(8 * self._capacity))
+        self._in_degree = array('q', bytes(8 * self._capacity)) if directed else self._out_degree
+        self._edge_count = 0
+
+    def _new_weights(self, capacity):
+        return array(self._typecode, bytes(array(self._typecode).itemsize * capacity * capacity))
+
+    def _grow(self, capacity=None):
+        old_capacity, old_row_bytes = self._capacity, self._row_bytes
+        capacity = capacity or old_capacity * 2
+        row_bytes = capacity >> 3
+        weights = self._new_weights(capacity)
+        for i in range(old_capacity):
+            weights[i * capacity:i * capacity + old_capacity] = \
+                self._weights[i * old_capacity:(i + 1) * old_capacity]
+
+        def grow_mask(mask):
+            grown = bytearray(capacity * row_bytes)
+            for i in range(old_capacity):
+                grown[i * row_bytes:i * row_bytes + old_row_bytes] = mask[i * old_row_bytes:(i + 1) * old_row_bytes]
+            return grown
+
+        self._weights = weights
+        self._mask = grow_mask(self._mask)
+        self._in_mask = grow_mask(self._in_mask) if self._directed else self._mask
+        self._out_degree.frombytes(bytes(8 * (capacity - old_capacity)))
+        if self._directed:
+            self._in_degree.frombytes(bytes(8 * (capacity - old_capacity)))
+        self._capacity, self._row_bytes = capacity, row_bytes
+
+    def _row(self, mask, i):
+        return mask[i * self._row_bytes:(i + 1) * self._row_bytes]
+
+    def _row_slots(self, mask, i):
+        """Yield the slots whose bit is set in row i of mask, skipping empty bytes."""
+        row = self._row(mask, i)
+        for k in compress(range(len(row)), row):
+            for b in _BYTE_BITS[row[k]]:
+                yield (k << 3) | b
+
+    def _has_bit(self, mask, i, j):
+        return mask[i * self._row_bytes + (j >> 3)] >> (j & 7) & 1
+
+    def _set_bit(self, mask, i, j):
+        mask[i * self._row_bytes + (j >> 3)] |= 1 << (j & 7)
+
+    def _clear_bit(self, mask, i, j):
+        mask[i * self._row_bytes + (j >> 3)] &= ~(1 << (j & 7)) & 0xFF
+
+    def _link(self, i, j):
+        if not self._has_bit(self._mask, i, j):
+            self._set_bit(self._mask, i, j)
+            self._set_bit(self._in_mask, j, i)
+            self._out_degree[i] += 1
+            if self._directed or i != j:  # the degree tables are shared when undirected
+                self._in_degree[j] += 1
+            self._edge_count += 1
+
+    def _unlink(self, i, j):
+        if self._has_bit(self._mask, i, j):
+            self._clear_bit(self._mask, i, j)
+            self._clear_bit(self._in_mask, j, i)
+            self._out_degree[i] -= 1
+            if self._directed or i != j:
+                self._in_degree[j] -= 1
+            self._edge_count -= 1
+
+    def vertex_count(self):
+        return len(self._index)
+
+    def vertices(self):
+        return self._index.keys()
+
+    def edge_count(self):
+        return self._edge_count
+
+    def edges(self):
+        return EdgeView(self)
+
+    def _scan_edges(self):
+        slots, weights, capacity, directed = self._slots, self._weights, self._capacity, self._directed
+        for i, u in enumerate(slots):
+            if u is not None:
+                for j in self._row_slots(self._mask, i):
+                    # an undirected edge sets bits (i, j) and (j, i); report the upper one
+                    if directed or j >= i:
+                        yield (u, slots[j], weights[i * capacity + j])
+
+    def get_edge(self, vertex1, vertex2):
+        i = self._index[vertex1]
+        j = self._index[vertex2]
+        if self._has_bit(self._mask, i, j):
+            return Edge(vertex1, vertex2, self._weights[i * self._capacity + j])
+        return None
+
+    def degree(self, vertex, outgoing=True):
+        degrees = self._out_degree if outgoing else self._in_degree
+        return degrees[self._index[vertex]]
+
+    def incident_edges(self, vertex, outgoing=True):
+        i = self._index[vertex]
+        mask = self._mask if outgoing else self._in_mask
+        for j in self._row_slots(mask, i):
+            if outgoing:
+                yield Edge(vertex, self._slots[j], self._weights[i * self._capacity + j])
+            else:
+                yield Edge(self._slots[j], vertex, self._weights[j * self._capacity + i])
+
+    def insert_vertex(self, vertex):
+        if vertex in self._index:
+            return
+        if self._free:
+            slot = self._free.pop()
+            self._slots[slot] = vertex
+        else:
+            slot = len(self._slots)
+            if slot == self._capacity:
+                self._grow()
+            self._slots.append(vertex)
+        self._index[vertex] = slot
+        self._notify('insert_vertex', vertex)
+
+    def insert_edge(self, vertex1, vertex2, weight=None):
+        i = self._index[vertex1]
+        j = self._index[vertex2]
+        weight = 1 if weight is None else weight
+        self._weights[i * self._capacity + j] = weight
+        if not self._directed:
+            self._weights[j * self._capacity + i] = weight
+        self._link(i, j)
+        self._notify('insert_edge', vertex1, vertex2, weight)
+
+    def bulk_insert_edges(self, edges):
+        if self._listeners:  # listeners expect one event per vertex and edge
+            return super().bulk_insert_edges(edges)
+        self._version += 1
+        edges = list(edges)
+        new = [v for v in dict.fromkeys(x for item in edges for x in item[:2]) if v not in self._index]
+        # Grow the matrix once to fit every new vertex
+        needed = len(self._slots) + max(0, len(new) - len(self._free))
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity > self._capacity:
+            self._grow(capacity)
+        for v in new:
+            self.insert_vertex(v)
+        insert_edge = self.insert_edge
+        for item in edges:
+            insert_edge(item[0], item[1], item[2] if len(item) > 2 else None)
+        return len(edges)
+
+    def remove_vertex(self, vertex):
+        if vertex not in self._index:
+            return
+        adjacent = self._adjacent_vertices(vertex) if self._listeners else ()
+        i = self._index.pop(vertex)
+        for j in self._row_slots(self._mask, i):
+            self._unlink(i, j)
+        for j in self._row_slots(self._in_mask, i):
+            self._unlink(j, i)
+        self._slots[i] = None
+        self._free.append(i)
+        self._notify('remove_vertex', vertex, adjacent)
+
+    def remove_edge(self, edge):
+        u, v = edge.endpoints()
+        if u in self._index and v in self._index:
+            self._unlink(self._index[u], self._index[v])
+            self._notify('remove_edge', u, v)
+
+
+_BYTE_BITS = [tuple(b for b in range(8) if value >> b & 1) for value in range(256)]
+
+
+class CSRGraph(GraphADT):
+    """Read-only graph stored in compressed sparse row form.
+
+    Vertices are mapped to the integer ids 0..n-1 and the neighbours of
+    vertex i are targets[offsets[i]:offsets[i + 1]], sorted so that get_edge
+    can binary search them. Weights live in a parallel array('d') when they
+    are all numbers, in a list otherwise, and are dropped when they are all
+    None. Directed graphs keep a second, transposed set of arrays for the
+    incoming edges. Use to_csr() or GraphADT.freeze() to build one, or
+    graph_io.load() to open one saved to disk."""
+
+    _path = None  # file the graph was loaded from, if any
+
+    def __init__(self, vertices=(), offsets=None, targets=None, weights=None, directed=False, incoming=None,
+                 loops=None):
+        # a sequence other than a list, like the lazily decoded labels of graph_io.load(), is kept as given
+        self._vertices = vertices if isinstance(vertices, Sequence) and not isinstance(vertices, list) \
+            else list(vertices)
+        self._offsets = offsets if offsets is not None else array('q', bytes(8 * (len(self._vertices) + 1)))
+        self._targets = targets if targets is not None else array('q')
+        self._weights = weights
+        self._directed = directed
+        if directed and incoming is not None:  # (offsets, targets, weights) of the reversed graph
+            self._in_offsets, self._in_targets, self._in_weights = incoming
+        elif directed:
+            self._in_offsets, self._in_targets, self._in_weights = _transpose(
+                len(self._vertices), self._offsets, self._targets, self._weights)
+        else:  # the rows of an undirected graph already hold every incident edge
+            self._in_offsets, self._in_targets, self._in_weights = self._offsets, self._targets, self._weights
+        # an undirected edge is listed in both rows, a self-loop once in its own
+        if directed:
+            self._loops = 0
+        elif loops is not None:  # counted by whoever built the rows
+            self._loops = loops
+        else:
+            self._loops = sum(self._count_in_row(i, i) for i in range(len(self._vertices)))
+
+    @cached_property
+    def _index(self):
+        """vertex -> id, built on first use."""
+        return {v: i for i, v in enumerate(self._vertices)}
+
+    def _count_in_row(self, i, j):
+        """Return how many times id j is listed in the sorted row of id i."""
+        lo, hi = self._offsets[i], self._offsets[i + 1]
+        k = bisect_left(self._targets, j, lo, hi)
+        return bisect_right(self._targets, j, k, hi) - k
+
+    def vertex_count(self):
+        return len(self._vertices)
+
+    def vertices(self):
+        return self._vertices
+
+    def index(self, vertex):
+        """Return the integer id of vertex."""
+        return self._index[vertex]
+
+    def vertex_at(self, i):
+        """Return the vertex whose integer id is i."""
+        return self._vertices[i]
+
+    def neighbour_ids(self, i, outgoing=True):
+        """Return the ids adjacent to the vertex with id i as a zero-copy memoryview."""
+        offsets, targets = (self._offsets, self._targets) if outgoing else (self._in_offsets, self._in_targets)
+        return memoryview(targets)[offsets[i]:offsets[i + 1]]
+
+    def edge_count(self):
+        return len(self._targets) if self._directed else (len(self._targets) + self._loops) // 2
+
+    def edges(self):
+        offsets, targets, vertices = self._offsets, self._targets, self._vertices
+        for i, u in enumerate(vertices):
+            for k in range(offsets[i], offsets[i + 1]):
+                j = targets[k]
+                if self._directed or i <= j:  # report each undirected edge once
+                    yield Edge(u, vertices[j], self._weight(self._weights, k))
+
+    def get_edge(self, u, v):
+        i, j = self._index.get(u), self._index.get(v)
+        if i is None or j is None:
+            return None
+        hi = self._offsets[i + 1]
+        k = bisect_left(self._targets, j, self._offsets[i], hi)
+        if k < hi and self._targets[k] == j:
+            return Edge(u, v, self._weight(self._weights, k))
+        return None
+
+    def degree(self, v, outgoing=True):
+        i = self._index[v]
+        offsets = self._offsets if outgoing else self._in_offsets
+        return offsets[i + 1] - offsets[i]
+
+    def incident_edges(self, v, outgoing=True):
+        for u, weight in self.neighbours(v, outgoing):
+            yield Edge(v, u, weight) if outgoing else Edge(u, v, weight)
+
+    def neighbours(self, vertex, outgoing=True):
+        if outgoing:
+            offsets, targets, weights = self._offsets, self._targets, self._weights
+        else:
+            offsets, targets, weights = self._in_offsets, self._in_targets, self._in_weights
+        i = self._index[vertex]
+        for k in range(offsets[i], offsets[i + 1]):
+            yield self._vertices[targets[k]], self._weight(weights, k)
+
+    @staticmethod
+    def _weight(weights, k):
+        return None if weights is None else weights[k]
+
+    def freeze(self):
+        return self
+
+    def insert_vertex(self, vertex):
+        raise TypeError("CSRGraph is read-only")
+
+    def insert_edge(self, vertex1, vertex2, weight=None):
+        raise TypeError("CSRGraph is read-only")
+
+    def remove_vertex(self, vertex):
+        raise TypeError("CSRGraph is read-only")
+
+    def remove_edge(self, edge):
+        raise TypeError("CSRGraph is read-only")
+
+
+def _opposite(edge, vertex):
+    if isinstance(edge, tuple):  # AdjacencyListGraph edges are plain (u, v) pairs
+        u, v = edge
+        return v if u is vertex else u
+    return edge.opposite(vertex)
+
+
+class SubgraphView(GraphADT):
+    """Read-only view of the subgraph of a parent graph induced by a vertex set.
+
+    Only the vertex set is stored; adjacency is read from the parent and
+    filtered on every call, so edge changes in the parent show through. The
+    edges reported are the parent's own edge objects. Use freeze() or
+    materialize() for an independent copy."""
+
+    def __init__(self, graph, vertices):
+        self._graph = graph
+        self._directed = graph.is_directed()
+        self._members = dict.fromkeys(vertices)  # insertion-ordered set
+        self._loops_listed_twice = graph._loops_listed_twice  # neighbours come from the parent
+
+    def vertex_count(self):
+        return len(self._members)
+
+    def vertices(self):
+        return self._members.keys()
+
+    def edge_count(self):
+        return sum(1 for _ in self.edges())
+
+    def edges(self):
+        members, directed = self._members, self._directed
+        done = set()  # vertices whose undirected edges were all reported
+        for v in members:
+            for edge in self._graph.incident_edges(v):
+                u = _opposite(edge, v)
+                if u in members and (directed or u not in done):
+                    yield edge
+            done.add(v)
+
+    def get_edge(self, vertex1, vertex2):
+        if vertex1 in self._members and vertex2 in self._members:
+            return self._graph.get_edge(vertex1, vertex2)
+        return None
+
+    def degree(self, vertex, outgoing=True):
+        return sum(1 for _ in self.incident_edges(vertex, outgoing))
+
+    def incident_edges(self, vertex, outgoing=True):
+        members = self._members
+        if vertex in members:
+            for edge in self._graph.incident_edges(vertex, outgoing):
+                if _opposite(edge, vertex) in members:
+                    yield edge
+
+    def neighbours(self, vertex, outgoing=True):
+        members = self._members
+        if vertex in members:
+            for u, weight in self._graph.neighbours(vertex, outgoing):
+                if u in members:
+                    yield u, weight
+
+    def materialize(self, backend=None):
+        """Return a copy of the subgraph: a CSRGraph by default, otherwise a
+        new graph of the given backend class filled through its bulk path."""
+        if backend is None:
+            return self.freeze()
+        graph = backend(directed=self._directed)
+        for v in self._members:
+            graph.insert_vertex(v)
+        graph.bulk_insert_edges(self._weighted_pairs())
+        return graph
+
+    def _weighted_pairs(self):
+        """Yield (vertex1, vertex2, weight) once per edge of the subgraph."""
+        done = set()
+        for v in self._members:
+            for u, weight in self.neighbours(v):
+                if self._directed or u not in done:
+                    yield v, u, weight
+            done.add(v)
+
+    def insert_vertex(self, vertex):
+        raise TypeError("SubgraphView is read-only")
+
+    def insert_edge(self, vertex1, vertex2, weight=None):
+        raise TypeError("SubgraphView is read-only")
+
+    def remove_vertex(self, vertex):
+        raise TypeError("SubgraphView is read-only")
+
+    def remove_edge(self, edge):
+        raise TypeError("SubgraphView is read-only")
+
+
+def _pack_weights(weights):
+    """Store weights compactly: None if all are None, array('d') if all are numbers."""
+    if all(w is None for w in weights):
+        return None
+    try:
+        return array('d', weights)
+    except TypeError:
+        return weights
+
+
+def _transpose(n, offsets, targets, weights):
+    """Return the CSR arrays of the reversed graph, rows sorted by source id."""
+    in_offsets = array('q', bytes(8 * (n + 1)))
+    for j in targets:
+        in_offsets[j + 1] += 1
+    for i in range(n):
+        in_offsets[i + 1] += in_offsets[i]
+    cursor = array('q', in_offsets[:-1])
+    in_targets = array('q', bytes(8 * len(targets)))
+    in_weights = None if weights is None else (
+        array('d', bytes(8 * len(targets))) if isinstance(weights, array) else [None] * len(targets))
+    for i in range(n):
+        for k in range(offsets[i], offsets[i + 1]):
+            pos = cursor[targets[k]]
+            cursor[targets[k]] += 1
+            in_targets[pos] = i
+            if in_weights is not None:
+                in_weights[pos] = weights[k]
+    return in_offsets, in_targets, in_weights
+
+
+def to_csr(graph):
+    """Return a read-only CSRGraph holding the vertices and edges of any GraphADT."""
+    if isinstance(graph, CSRGraph):
+        return graph
+    if type(graph).freeze is not GraphADT.freeze:  # e.g. ConcurrentGraph builds it under its lock
+        return graph.freeze()
+    vertices = list(graph.vertices())
+    index = {v: i for i, v in enumerate(vertices)}
+    offsets, targets, weights = _rows(graph, vertices, index)
+    incoming = None
+    if graph.is_directed() and graph._keeps_incoming:  # read the reversed rows instead of transposing
+        in_offsets, in_targets, in_weights = _rows(graph, vertices, index, outgoing=False)
+        incoming = in_offsets, in_targets, _pack_weights(in_weights)
+    return CSRGraph(vertices, offsets, targets, _pack_weights(weights), graph.is_directed(), incoming)
+
+
+def _rows(graph, vertices, index, outgoing=True):
+    """Return the CSR offsets and targets and the list of weights of the
+    rows of graph, built from its outgoing or incoming neighbours."""
+    offsets = array('q', [0])
+    targets = array('q')
+    weights = []
+    halve_loops = graph._loops_listed_twice and not graph.is_directed()
+    for v in vertices:
+        row = sorted(((index[u], w) for u, w in graph.neighbours(v, outgoing)), key=itemgetter(0))
+        if halve_loops:  # CSRGraph lists an undirected self-loop once in its row
+            i, loops, kept = index[v], 0, []
+            for entry in row:
+                if entry[0] == i:
+                    loops += 1
+                    if not loops % 2:
+                        continue
+                kept.append(entry)
+            row = kept
+        targets.extend(j for j, _ in row)
+        weights.extend(w for _, w in row)
+        offsets.append(len(targets))
+    return offsets, targets, weights
@@ -1,4 +1,21 @@
 from graphADT import *
+from graph_algorithms import *
+from graph_io import *
+from graph_parallel import *
+from graph_routing import *
+from graph_mst import *
+from graph_dynamic import *
+from graph_centrality import *
+import graph_centrality
+from graph_generators import *
+from graph_concurrent import *
+import threading
+from benchmark import run_benchmarks, FIELDS
+
+import os
+import random
+import tempfile
+from math import inf
 
 from unittest import TestCase
 
@@ -81,6 +98,75 @@ class TestEdgeListGraph(TestCase):
         self.assertEqual(0, len(edges_4))
         self.assertEqual(0, len(edges_5))
 
+    def test_indexed_matches_scanning(self):
+        scanning = EdgeListGraph(directed=False, indexed=False)
+        scanning.insert_vertex_array([self.v1, self.v2, self.v3, self.v4])
+        for graph in (self.graph, scanning):
+            graph.insert_edge(self.v1, self.v2, 'edge1')
+            graph.insert_edge(self.v1, self.v2, 'edge2')
+            graph.insert_edge(self.v2, self.v3, 'edge3')
+            graph.insert_edge(self.v4, self.v4, 'loop')
+        for v in (self.v1, self.v2, self.v3, self.v4):
+            self.assertEqual(scanning.degree(v), self.graph.degree(v))
+        self.assertEqual(4, len(self.graph.get_edge(self.v2, self.v1)))
+        self.assertEqual(2, len(self.graph.get_edge(self.v4, self.v4)))
+
+        self.graph.remove_vertex(self.v2)
+        scanning.remove_vertex(self.v2)
+        self.assertEqual(scanning.edge_count(), self.graph.edge_count())
+        self.assertEqual(0, self.graph.degree(self.v1))
+        self.assertEqual([], self.graph.get_edge(self.v1, self.v2))
+
+        self.digraph.insert_edge(self.u1, self.u2, 'edge1')
+        self.digraph.insert_edge(self.u2, self.u3, 'edge2')
+        self.digraph.remove_vertex(self.u2)
+        self.assertEqual(0, self.digraph.edge_count())
+        self.assertEqual(0, self.digraph.degree(self.u1))
+        self.assertEqual(0, self.digraph.degree(self.u3, outgoing=False))
+
+    def test_bulk_matches_insert_edge(self):
+        twin = Vertex('u')  # equal to self.v1, so it names the same stored vertex
+        items = [(self.v1, self.v2, 1), (twin, self.v3, 2), (self.v2, self.v1, 3), (self.v4, self.v4, 4)]
+        for directed in (False, True):
+            for indexed in (True, False):
+                one_by_one, bulk = EdgeListGraph(directed, indexed), EdgeListGraph(directed, indexed)
+                for u, v, w in items:
+                    one_by_one.insert_edge(u, v, w)
+                self.assertEqual(bulk.bulk_insert_edges(iter(items)), 4)
+                self.assertEqual(bulk.vertex_count(), 4)
+                self.assertTrue(all(edge.endpoints()[0] is not twin for edge in bulk.edges()))
+                self.assertEqual([(e.endpoints(), e.weight()) for e in bulk.edges()],
+                                 [(e.endpoints(), e.weight()) for e in one_by_one.edges()])
+                for v in (self.v1, self.v2, self.v3, self.v4):
+                    self.assertEqual(bulk.degree(v), one_by_one.degree(v))
+                    self.assertEqual(bulk.degree(v, outgoing=False), one_by_one.degree(v, outgoing=False))
+                    self.assertEqual(len(bulk.get_edge(self.v1, v)), len(one_by_one.get_edge(self.v1, v)))
+
+    def test_lists_returned(self):
+        self.graph.insert_edge(self.v1, self.v2, 'edge1')
+        self.assertEqual(self.graph.vertices()[0], self.v1)
+        self.assertEqual(self.graph.edges()[1].endpoints(), (self.v2, self.v1))
+        self.graph.remove_vertex(self.v1)
+        self.assertEqual(self.graph.vertices(), [self.v2, self.v3, self.v4])
+        self.assertEqual(self.graph.edges(), [])
+
+    def test_vertices_match_by_value(self):
+        scanning = EdgeListGraph(directed=True, indexed=False)
+        scanning.insert_vertex_array([self.u1, self.u2, self.u3, self.u4])
+        for graph in (self.digraph, scanning):
+            graph.insert_edge(self.u1, self.u2, 'edge1')
+            graph.insert_edge(Vertex('ud'), Vertex('wd'), 'edge2')  # equal to u1 and u3
+            self.assertEqual(4, graph.vertex_count())
+            self.assertEqual(1, len(graph.get_edge(Vertex('ud'), Vertex('vd'))))
+            self.assertEqual(2, graph.degree(Vertex('ud')))
+            self.assertEqual(1, graph.degree(Vertex('wd'), outgoing=False))
+            self.assertEqual({self.u2, self.u3}, {e.endpoints()[1] for e in graph.incident_edges(Vertex('ud'))})
+            self.assertEqual({self.u2, self.u3}, {u for u, _ in graph.neighbours(Vertex('ud'))})
+            self.assertIs(graph.get_edge(self.u1, self.u3)[0].endpoints()[0], self.u1)
+            graph.remove_vertex(Vertex('ud'))
+            self.assertEqual(0, graph.edge_count())
+            self.assertEqual(3, graph.vertex_count())
+
 
 class TestAdjacencyListGraph(TestCase):
 
@@ -186,6 +272,28 @@ class TestAdjacencyMapGraph(TestCase):
         edges = list(self.graph.incident_edges(self.v1))
         self.assertEqual(len(edges), 2)
 
+    def test_insert_existing_vertex(self):
+        self.graph.insert_edge(self.v1, self.v2, 'edge1')
+        events = []
+        self.graph.subscribe(lambda *event: events.append(event))
+        self.graph.insert_vertex(self.v1)
+        self.assertEqual(events, [])
+        self.assertEqual(self.graph.edge_count(), 1)
+        self.assertIsNotNone(self.graph.get_edge(self.v1, self.v2))
+
+    def test_remove_self_loop(self):
+        for directed in (False, True):
+            graph = AdjacencyMapGraph(directed=directed)
+            for v in (self.v1, self.v2):
+                graph.insert_vertex(v)
+            graph.insert_edge(self.v1, self.v1, 1)
+            graph.insert_edge(self.v1, self.v2, 2)
+            graph.remove_edge(graph.get_edge(self.v1, self.v1))
+            self.assertEqual(graph.edge_count(), 1)
+            self.assertIsNone(graph.get_edge(self.v1, self.v1))
+            self.assertEqual(graph.degree(self.v1), 1)
+            self.assertEqual(graph.degree(self.v1, outgoing=False), 0 if directed else 1)
+
 
 class TestAdjacencyMatrixGraph(TestCase):
 
@@ -235,3 +343,1051 @@ class TestAdjacencyMatrixGraph(TestCase):
         self.assertEqual(directed_graph.degree(self.v1, outgoing=False), 0)
         self.assertEqual(directed_graph.degree(self.v2, outgoing=True), 0)
         self.assertEqual(directed_graph.degree(self.v2, outgoing=False), 1)
+
+    def test_self_loops(self):
+        for directed in (False, True):
+            graph = AdjacencyMatrixGraph(directed=directed)
+            graph.bulk_insert_edges([(self.v1, self.v1, 1), (self.v1, self.v2, 2), (self.v3, self.v1, 3)])
+            edges = graph.edges()
+            self.assertEqual(graph.edge_count(), 3)
+            self.assertEqual(len(edges), len(list(edges)))
+            graph.remove_edge(graph.get_edge(self.v1, self.v1))
+            self.assertEqual(graph.edge_count(), 2)
+            graph.insert_edge(self.v1, self.v1, 1)
+            graph.remove_vertex(self.v1)
+            self.assertEqual(graph.edge_count(), 0)
+            self.assertEqual(list(graph.edges()), [])
+
+
+class TestCSRGraph(TestCase):
+
+    def setUp(self):
+        self.v1 = Vertex('u')
+        self.v2 = Vertex('v')
+        self.v3 = Vertex('w')
+        self.v4 = Vertex('z')
+        source = AdjacencyMapGraph(directed=False)
+        for v in (self.v1, self.v2, self.v3, self.v4):
+            source.insert_vertex(v)
+        source.insert_edge(self.v1, self.v2, 1.5)
+        source.insert_edge(self.v1, self.v3, 2.0)
+        self.graph = source.freeze()
+
+        disource = AdjacencyMapGraph(directed=True)
+        for v in (self.v1, self.v2, self.v3, self.v4):
+            disource.insert_vertex(v)
+        disource.insert_edge(self.v1, self.v2, 'edge1')
+        disource.insert_edge(self.v3, self.v2, 'edge2')
+        self.digraph = to_csr(disource)
+
+    def test_vertex_operations(self):
+        self.assertEqual(self.graph.vertex_count(), 4)
+        self.assertEqual(self.graph.vertex_at(self.graph.index(self.v3)), self.v3)
+        self.assertRaises(TypeError, self.graph.insert_vertex, Vertex('x'))
+        self.assertRaises(TypeError, self.graph.remove_vertex, self.v1)
+
+    def test_edge_operations(self):
+        self.assertEqual(self.graph.edge_count(), 2)
+        self.assertEqual(len(list(self.graph.edges())), 2)
+        self.assertEqual(self.graph.get_edge(self.v2, self.v1).weight(), 1.5)
+        self.assertIsNone(self.graph.get_edge(self.v2, self.v3))
+
+        self.assertEqual(self.digraph.edge_count(), 2)
+        self.assertEqual(self.digraph.get_edge(self.v1, self.v2).weight(), 'edge1')
+        self.assertIsNone(self.digraph.get_edge(self.v2, self.v1))
+
+    def test_self_loops(self):
+        for directed in (False, True):
+            source = AdjacencyMapGraph(directed=directed)
+            for v in (self.v1, self.v2):
+                source.insert_vertex(v)
+            source.insert_edge(self.v1, self.v1, 1.0)
+            source.insert_edge(self.v1, self.v2, 2.0)
+            graph = source.freeze()
+            self.assertEqual(graph.edge_count(), 2)
+            self.assertEqual(len(list(graph.edges())), 2)
+            self.assertEqual(graph.get_edge(self.v1, self.v1).weight(), 1.0)
+
+    def test_vertex_degree(self):
+        self.assertEqual(self.graph.degree(self.v1), 2)
+        self.assertEqual(self.graph.degree(self.v2), 1)
+        self.assertEqual(self.graph.degree(self.v4), 0)
+
+        self.assertEqual(self.digraph.degree(self.v2), 0)
+        self.assertEqual(self.digraph.degree(self.v2, outgoing=False), 2)
+
+    def test_incident_edges(self):
+        edges = list(self.graph.incident_edges(self.v1))
+        self.assertEqual(len(edges), 2)
+
+        edges = list(self.digraph.incident_edges(self.v2, outgoing=False))
+        self.assertEqual({e.endpoints()[0] for e in edges}, {self.v1, self.v3})
+
+    def test_freeze_from_other_backends(self):
+        for backend in (EdgeListGraph, AdjacencyListGraph, AdjacencyMatrixGraph):
+            graph = backend(directed=False)
+            for v in (self.v1, self.v2, self.v3):
+                graph.insert_vertex(v)
+            graph.insert_edge(self.v1, self.v2, 1)
+            graph.insert_edge(self.v2, self.v3, 2)
+            frozen = graph.freeze()
+            self.assertEqual(frozen.edge_count(), 2)
+            self.assertEqual(frozen.degree(self.v2), 2)
+
+    def test_freeze_reads_incoming_rows(self):
+        v4 = Vertex('z')
+        edges = [(self.v1, self.v2, 1.5), (self.v3, self.v2, 2.0), (self.v2, self.v2, 0.5), (v4, self.v1, 3.0)]
+        for backend in (EdgeListGraph, AdjacencyMapGraph, CompactEdgeListGraph):
+            graph = backend(directed=True)
+            for v in (self.v1, self.v2, self.v3, v4):
+                graph.insert_vertex(v)
+            graph.bulk_insert_edges(edges)
+            frozen = graph.freeze()
+            transposed = CSRGraph(frozen.vertices(), frozen._offsets, frozen._targets, frozen._weights, True)
+            self.assertEqual(list(frozen._in_offsets), list(transposed._in_offsets))
+            self.assertEqual(list(frozen._in_targets), list(transposed._in_targets))
+            self.assertEqual(list(frozen._in_weights), list(transposed._in_weights))
+            self.assertEqual(dict(frozen.neighbours(self.v2, outgoing=False)), {self.v1: 1.5, self.v2: 0.5, self.v3: 2.0})
+
+    def test_freeze_self_loops(self):
+        for backend in (EdgeListGraph, AdjacencyListGraph, AdjacencyMapGraph, CompactEdgeListGraph):
+            graph = backend(directed=False)
+            for v in (self.v1, self.v2):
+                graph.insert_vertex(v)
+            graph.insert_edge(self.v1, self.v1, 1)
+            graph.insert_edge(self.v1, self.v2, 1)
+            frozen = graph.freeze()
+            self.assertEqual(frozen.edge_count(), 2, msg=backend.__name__)
+            self.assertEqual(sorted(str(v) for v, _ in frozen.neighbours(self.v1)), ['u', 'v'])
+            self.assertEqual(frozen.induced_subgraph([self.v1]).freeze().edge_count(), 1)
+            self.assertEqual(graph.induced_subgraph([self.v1, self.v2]).freeze().edge_count(), 2)
+
+
+class TestDenseMatrixGraph(TestCase):
+
+    def setUp(self):
+        self.graph = DenseMatrixGraph(directed=False)
+        self.v1 = Vertex('u')
+        self.v2 = Vertex('v')
+        self.v3 = Vertex('w')
+        self.v4 = Vertex('z')
+        self.graph.insert_vertex(self.v1)
+        self.graph.insert_vertex(self.v2)
+        self.graph.insert_vertex(self.v3)
+        self.graph.insert_vertex(self.v4)
+
+    def test_vertex_operations(self):
+        self.assertEqual(self.graph.vertex_count(), 4)
+        self.graph.insert_edge(self.v1, self.v2, 1.0)
+        self.graph.remove_vertex(self.v1)
+        self.assertEqual(self.graph.vertex_count(), 3)
+        self.assertNotIn(self.v1, self.graph.vertices())
+        self.assertEqual(self.graph.degree(self.v2), 0)
+
+    def test_edge_operations(self):
+        self.graph.insert_edge(self.v1, self.v2, 2.5)
+        self.graph.insert_edge(self.v3, self.v3, 1.0)
+        self.assertEqual(self.graph.edge_count(), 2)
+        edge = self.graph.get_edge(self.v2, self.v1)
+        self.assertEqual(edge.weight(), 2.5)
+        self.graph.remove_edge(edge)
+        self.assertIsNone(self.graph.get_edge(self.v1, self.v2))
+        self.assertEqual(self.graph.edge_count(), 1)
+
+    def test_vertex_degree(self):
+        self.graph.insert_edge(self.v1, self.v2)
+        self.graph.insert_edge(self.v1, self.v3)
+        self.assertEqual(self.graph.degree(self.v1), 2)
+        self.assertEqual(self.graph.degree(self.v2), 1)
+
+    def test_incident_edges(self):
+        self.graph.insert_edge(self.v1, self.v2)
+        self.graph.insert_edge(self.v1, self.v3)
+        edges = list(self.graph.incident_edges(self.v1))
+        self.assertEqual(len(edges), 2)
+
+    def test_directed_graph_growth(self):
+        directed_graph = DenseMatrixGraph(directed=True)
+        vertices = [Vertex(i) for i in range(40)]
+        for v in vertices:
+            directed_graph.insert_vertex(v)
+        for u, v in zip(vertices, vertices[1:]):
+            directed_graph.insert_edge(u, v, u.value())
+        self.assertEqual(directed_graph.edge_count(), 39)
+        self.assertEqual(directed_graph.degree(vertices[0], outgoing=False), 0)
+        self.assertEqual(directed_graph.degree(vertices[39], outgoing=False), 1)
+        self.assertEqual(directed_graph.get_edge(vertices[30], vertices[31]).weight(), 30)
+        self.assertIsNone(directed_graph.get_edge(vertices[31], vertices[30]))
+        directed_graph.remove_vertex(vertices[10])
+        self.assertEqual(directed_graph.edge_count(), 37)
+        self.assertEqual(directed_graph.degree(vertices[9]), 0)
+        self.assertEqual(directed_graph.degree(vertices[11], outgoing=False), 0)
+
+    def test_edges_listed_once(self):
+        self.graph.insert_edge(self.v1, self.v2, 2)
+        self.graph.insert_edge(self.v3, self.v3, 3)
+        edges = self.graph.edges()
+        self.assertEqual(len(edges), self.graph.edge_count())
+        self.assertEqual(sorted((u.value(), v.value(), w) for u, v, w in edges), [('u', 'v', 2), ('w', 'w', 3)])
+        self.assertIn((self.v1, self.v2, 2), edges)
+        self.graph.remove_edge(self.graph.get_edge(self.v2, self.v1))
+        self.assertEqual(list(self.graph.edges()), [(self.v3, self.v3, 3)])
+
+
+class TestGraphAlgorithms(TestCase):
+
+    def setUp(self):
+        self.v1 = Vertex('u')
+        self.v2 = Vertex('v')
+        self.v3 = Vertex('w')
+        self.v4 = Vertex('z')
+        self.v5 = Vertex('y')
+        self.backends = (EdgeListGraph, AdjacencyListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph)
+
+    def build(self, backend, directed):
+        graph = backend(directed=directed)
+        for v in (self.v1, self.v2, self.v3, self.v4, self.v5):
+            graph.insert_vertex(v)
+        graph.insert_edge(self.v1, self.v2, 4)
+        graph.insert_edge(self.v1, self.v3, 1)
+        graph.insert_edge(self.v3, self.v2, 2)
+        graph.insert_edge(self.v2, self.v4, 5)
+        return graph
+
+    def test_bfs_and_dfs(self):
+        for backend in self.backends:
+            graph = self.build(backend, directed=True)
+            for g in (graph, graph.freeze()):
+                result = bfs(g, self.v1)
+                self.assertEqual(result.distance_to(self.v4), 2)
+                self.assertFalse(result.reached(self.v5))
+                self.assertEqual(result.path_to(self.v4), [self.v1, self.v2, self.v4])
+                result = dfs(g, self.v1)
+                self.assertEqual(len(result.order), 4)
+                self.assertIsNone(result.path_to(self.v5))
+
+    def test_shortest_paths(self):
+        for backend in (EdgeListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph):
+            graph = self.build(backend, directed=True)
+            for g in (graph, graph.freeze()):
+                result = dijkstra(g, self.v1)
+                self.assertEqual(result.distance_to(self.v4), 8)
+                self.assertEqual(result.path_to(self.v2), [self.v1, self.v3, self.v2])
+                self.assertEqual(bellman_ford(g, self.v1).distance_to(self.v4), 8)
+
+    def test_negative_weights(self):
+        graph = self.build(AdjacencyMapGraph, directed=True)
+        graph.insert_edge(self.v4, self.v5, -3)
+        self.assertEqual(bellman_ford(graph, self.v1).distance_to(self.v5), 5)
+        self.assertRaises(ValueError, dijkstra, graph, self.v1)
+        graph.insert_edge(self.v5, self.v2, -3)
+        self.assertRaises(ValueError, bellman_ford, graph, self.v1)
+
+    def test_topological_sort(self):
+        graph = self.build(AdjacencyMapGraph, directed=True)
+        order = topological_sort(graph)
+        self.assertLess(order.index(self.v3), order.index(self.v2))
+        self.assertLess(order.index(self.v2), order.index(self.v4))
+        graph.insert_edge(self.v4, self.v1)
+        self.assertRaises(ValueError, topological_sort, graph)
+
+    def test_connected_components(self):
+        for backend in self.backends:
+            for directed in (False, True):
+                result = connected_components(self.build(backend, directed))
+                self.assertEqual(result.count, 2)
+                self.assertEqual(result.component_of(self.v1), result.component_of(self.v4))
+                self.assertNotEqual(result.component_of(self.v1), result.component_of(self.v5))
+
+
+class TestBulkLoading(TestCase):
+
+    def setUp(self):
+        self.v1 = Vertex('u')
+        self.v2 = Vertex('v')
+        self.v3 = Vertex('w')
+        self.backends = (EdgeListGraph, AdjacencyListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph,
+                         DenseMatrixGraph)
+        handle, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w') as file:
+            file.write("# comment\nu v 1.5\nv w\n\nw u 2\n")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_bulk_insert_edges(self):
+        for backend in self.backends:
+            graph = backend(directed=True)
+            graph.insert_vertex(self.v1)
+            count = graph.bulk_insert_edges([(self.v1, self.v2, 1.0), (self.v2, self.v3, 2.0), (self.v3, self.v1, 3.0)])
+            self.assertEqual(count, 3)
+            self.assertEqual(graph.vertex_count(), 3)
+            self.assertEqual(graph.edge_count(), 3)
+            self.assertEqual(graph.degree(self.v1, outgoing=False), 1)
+
+    def test_read_edge_list(self):
+        for use_mmap in (False, True):
+            graph = read_edge_list(self.path, directed=True, use_mmap=use_mmap)
+            self.assertEqual(graph.vertex_count(), 3)
+            self.assertEqual(graph.edge_count(), 3)
+            labels = {v.value(): v for v in graph.vertices()}
+            self.assertEqual(graph.get_edge(labels['u'], labels['v']).weight(), 1.5)
+            self.assertIsNone(graph.get_edge(labels['v'], labels['w']).weight())
+
+        with open(self.path, 'w') as file:
+            file.write("u,v,1\nv,w,2\n")
+        graph = read_edge_list(self.path, graph=EdgeListGraph(directed=False), delimiter=',')
+        self.assertEqual(graph.edge_count(), 4)
+
+
+class TestBinaryFormat(TestCase):
+
+    def setUp(self):
+        self.v1 = Vertex('u')
+        self.v2 = Vertex('v')
+        self.v3 = Vertex('w')
+        self.graph = AdjacencyMapGraph(directed=True)
+        self.graph.bulk_insert_edges([(self.v1, self.v2, 1.5), (self.v2, self.v3, 2.0), (self.v3, self.v1, 0.5)])
+        handle, self.path = tempfile.mkstemp(suffix='.graph')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        self.graph.save(self.path)
+        for use_mmap in (True, False):
+            graph = load(self.path, mmap=use_mmap)
+            labels = {v.value(): v for v in graph.vertices()}
+            self.assertTrue(graph.is_directed())
+            self.assertEqual(graph.vertex_count(), 3)
+            self.assertEqual(graph.edge_count(), 3)
+            self.assertEqual(graph.get_edge(labels['v'], labels['w']).weight(), 2.0)
+            self.assertIsNone(graph.get_edge(labels['w'], labels['v']))
+            self.assertEqual(graph.degree(labels['u'], outgoing=False), 1)
+            self.assertEqual(dijkstra(graph, labels['u']).distance_to(labels['w']), 3.5)
+
+    def test_unweighted_undirected(self):
+        graph = AdjacencyListGraph(directed=False)
+        graph.bulk_insert_edges([(self.v1, self.v2), (self.v2, self.v3)])
+        graph.save(self.path)
+        loaded = load(self.path)
+        labels = {v.value(): v for v in loaded.vertices()}
+        self.assertEqual(loaded.edge_count(), 2)
+        self.assertEqual(loaded.degree(labels['v']), 2)
+        self.assertIsNone(loaded.get_edge(labels['u'], labels['v']).weight())
+
+    def test_lazy_labels_and_loops(self):
+        graph = AdjacencyMapGraph(directed=False)
+        graph.bulk_insert_edges([(self.v1, self.v1, 1.0), (self.v1, self.v2, 2.0), (self.v2, self.v3, 3.0)])
+        graph.save(self.path)
+        for use_mmap in (True, False):
+            loaded = load(self.path, mmap=use_mmap)
+            self.assertEqual(loaded.edge_count(), 3)
+            self.assertNotIn('_index', vars(loaded))
+            self.assertEqual(loaded._vertices._decoded, [None] * 3)
+            last = loaded.vertex_at(-1)
+            self.assertIs(loaded.vertex_at(2), last)
+            self.assertEqual(last.value(), 'w')
+            self.assertEqual(loaded._vertices._decoded.count(None), 2)
+            self.assertEqual([v.value() for v in loaded.vertices()], ['u', 'v', 'w'])
+            self.assertEqual(loaded.degree(last), 1)
+
+    def test_rejects_non_numeric_weights(self):
+        self.graph.insert_edge(self.v1, self.v3, 'edge1')
+        self.assertRaises(ValueError, self.graph.save, self.path)
+
+
+class TestParallelSearch(TestCase):
+
+    def setUp(self):
+        self.vertices = [Vertex(i) for i in range(6)]
+        self.graph = AdjacencyMapGraph(directed=True)
+        self.graph.bulk_insert_edges((u, v, 2.0) for u, v in zip(self.vertices, self.vertices[1:]))
+
+    def test_parallel_bfs(self):
+        results = dict(parallel_bfs(self.graph, self.vertices[:3], workers=2, chunk_size=1))
+        self.assertEqual(set(results), set(self.vertices[:3]))
+        for source, result in results.items():
+            self.assertEqual(list(result.distance), list(bfs(self.graph, source).distance))
+
+    def test_all_pairs_shortest_paths(self):
+        rows = dict(all_pairs_shortest_paths(self.graph, workers=2))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[self.vertices[1]].distance_to(self.vertices[4]), 6.0)
+        self.assertFalse(rows[self.vertices[4]].reached(self.vertices[1]))
+
+
+class TestDegreeBookkeeping(TestCase):
+
+    def setUp(self):
+        self.vertices = [Vertex(i) for i in range(5)]
+        self.backends = (EdgeListGraph, AdjacencyListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph,
+                         DenseMatrixGraph, CompactEdgeListGraph)
+
+    def build(self, backend, directed):
+        graph = backend(directed=directed)
+        v = self.vertices
+        for vertex in v:
+            graph.insert_vertex(vertex)
+        graph.bulk_insert_edges([(v[0], v[1], 1), (v[0], v[2], 1), (v[0], v[3], 1), (v[1], v[2], 1)])
+        graph.insert_edge(v[3], v[4], 1)
+        return graph
+
+    def test_counts_follow_mutations(self):
+        v = self.vertices
+        for backend in self.backends:
+            for directed in (True, False):
+                graph = self.build(backend, directed)
+                per_edge = 2 if backend is EdgeListGraph and not directed else 1
+                self.assertEqual(graph.edge_count(), 5 * per_edge)
+                self.assertEqual(graph.degree(v[2], outgoing=False), 2)
+                graph.remove_vertex(v[0])
+                self.assertEqual(graph.edge_count(), 2 * per_edge)
+                self.assertEqual(graph.degree(v[2], outgoing=False), 1)
+                self.assertEqual(graph.degree(v[3], outgoing=False), 0 if directed else 1)
+                edge = graph.get_edge(v[3], v[4])
+                graph.remove_edge(edge[0] if isinstance(edge, list) else edge)
+                self.assertEqual(graph.edge_count(), per_edge)
+                self.assertEqual(graph.degree(v[4], outgoing=False), 0)
+
+    def test_histogram_and_top_k(self):
+        v = self.vertices
+        graph = self.build(AdjacencyMapGraph, directed=True)
+        self.assertEqual(graph.degree_histogram(), {3: 1, 1: 2, 0: 2})
+        self.assertEqual(graph.top_k_degree(1), [(v[0], 3)])
+        self.assertEqual(graph.top_k_degree(1, outgoing=False), [(v[2], 2)])
+
+
+class TestCompactEdgeListGraph(TestCase):
+
+    def setUp(self):
+        self.graph = CompactEdgeListGraph(directed=False)
+        self.v1 = Vertex('u')
+        self.v2 = Vertex('v')
+        self.v3 = Vertex('w')
+        self.v4 = Vertex('z')
+        for v in (self.v1, self.v2, self.v3, self.v4):
+            self.graph.insert_vertex(v)
+
+        self.digraph = CompactEdgeListGraph(directed=True)
+        for v in (self.v1, self.v2, self.v3, self.v4):
+            self.digraph.insert_vertex(v)
+
+    def test_vertex_operations(self):
+        self.graph.insert_edge(self.v1, self.v2)
+        self.assertEqual(self.graph.vertex_count(), 4)
+        self.graph.remove_vertex(self.v1)
+        self.assertEqual(self.graph.vertex_count(), 3)
+        self.assertEqual(self.graph.edge_count(), 0)
+        self.assertEqual(self.graph.degree(self.v2), 0)
+
+    def test_edge_operations(self):
+        edge = self.graph.insert_edge(self.v1, self.v2, 1.5)
+        self.assertEqual(self.graph.edge_count(), 1)  # undirected edges are stored once
+        self.assertEqual(self.graph.get_edge(self.v2, self.v1), edge)
+        self.assertEqual(edge.weight(), 1.5)
+        self.assertEqual(edge.opposite(self.v2), self.v1)
+        self.graph.remove_edge(edge)
+        self.assertEqual(self.graph.edge_count(), 0)
+        self.assertIsNone(self.graph.get_edge(self.v1, self.v2))
+
+        edge = self.digraph.insert_edge(self.v1, self.v2)
+        self.assertIsNone(edge.weight())
+        self.assertIsNone(self.digraph.get_edge(self.v2, self.v1))
+        reused = self.digraph.insert_edge(self.v3, self.v4, 2)
+        self.digraph.remove_edge(edge)
+        self.assertEqual(self.digraph.insert_edge(self.v4, self.v1).handle(), edge.handle())
+        self.assertEqual(reused.endpoints(), (self.v3, self.v4))
+
+    def test_incident_edges(self):
+        self.digraph.bulk_insert_edges([(self.v1, self.v2, 1), (self.v1, self.v3, 2), (self.v3, self.v3, 3)])
+        self.assertEqual(len(list(self.digraph.incident_edges(self.v1))), 2)
+        self.assertEqual(dict(self.digraph.neighbours(self.v3, outgoing=False)), {self.v1: 2, self.v3: 3})
+        self.digraph.remove_vertex(self.v3)
+        self.assertEqual(self.digraph.edge_count(), 1)
+        self.assertEqual(len(list(self.digraph.edges())), 1)
+
+    def test_rejected_weight(self):
+        v5 = Vertex('y')
+        for weight in ('edge1', object()):
+            with self.assertRaises((TypeError, ValueError)):
+                self.graph.insert_edge(self.v2, v5, weight)
+        self.assertNotIn(v5, self.graph.vertices())
+        self.assertEqual(self.graph.edge_count(), 0)
+        edge = self.graph.insert_edge(self.v3, self.v4, 2.0)
+        self.assertEqual(edge.endpoints(), (self.v3, self.v4))
+        self.assertEqual(list(self.graph.neighbours(self.v3)), [(self.v4, 2.0)])
+
+        self.graph.remove_edge(edge)  # the rejected edge must not take the free handle either
+        with self.assertRaises(ValueError):
+            self.graph.bulk_insert_edges([(self.v1, self.v2, 'edge1')])
+        self.assertEqual(self.graph.insert_edge(self.v1, self.v2).handle(), edge.handle())
+        self.assertEqual(self.graph.edge_count(), 1)
+
+    def test_stale_and_foreign_handles(self):
+        stale = self.graph.insert_edge(self.v1, self.v2)
+        self.graph.remove_edge(stale)
+        current = self.graph.insert_edge(self.v3, self.v4)  # takes the freed handle
+        self.assertEqual(current.handle(), stale.handle())
+        self.assertNotEqual(current, stale)
+        self.graph.remove_edge(stale)
+        self.digraph.remove_edge(current)
+        self.assertEqual(self.graph.edge_count(), 1)
+        self.assertEqual(self.graph.get_edge(self.v3, self.v4), current)
+        self.digraph.insert_edge(self.v1, self.v2)
+        self.graph.remove_edge(self.digraph.get_edge(self.v1, self.v2))
+        self.assertEqual(self.graph.edge_count(), 1)
+        self.graph.remove_edge(current)
+        self.assertEqual(self.graph.edge_count(), 0)
+
+
+class TestBenchmark(TestCase):
+
+    def test_run_benchmarks(self):
+        rows = run_benchmarks(sizes=[16], densities=[0.2], queries=10)
+        self.assertTrue(rows)
+        self.assertEqual({row['backend'] for row in rows}, {'edge_list', 'adjacency_list', 'adjacency_map',
+                                                            'adjacency_matrix', 'dense_matrix', 'compact_edge_list'})
+        for row in rows:
+            self.assertEqual(set(row), set(FIELDS))
+
+
+class TestPathQuery(TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.vertices = [Vertex((i % 10, i // 10)) for i in range(100)]
+        self.graph = AdjacencyMapGraph(directed=True)
+        self.graph.bulk_insert_edges((self.vertices[rng.randrange(100)], self.vertices[rng.randrange(100)],
+                                      rng.randint(1, 9)) for _ in range(400))
+        self.isolated = Vertex('isolated')
+        self.graph.insert_vertex(self.isolated)
+        self.query = PathQuery(self.graph)
+
+    def test_matches_dijkstra(self):
+        for source in self.vertices[:10]:
+            expected = dijkstra(self.graph, source)
+            for target in self.vertices[::7]:
+                distance, path = self.query.bidirectional_dijkstra(source, target)
+                self.assertEqual(distance, expected.distance_to(target))
+                self.assertEqual(self.query.astar(source, target)[0], distance)
+                if path is not None:
+                    self.assertEqual((path[0], path[-1]), (source, target))
+                    self.assertEqual(sum(self.graph.get_edge(u, v).weight() for u, v in zip(path, path[1:])),
+                                     distance)
+
+    def test_unreachable_and_trivial(self):
+        source = self.vertices[0]
+        self.assertEqual(self.query.bidirectional_dijkstra(source, self.isolated), (inf, None))
+        self.assertEqual(self.query.astar(source, self.isolated), (inf, None))
+        self.assertEqual(self.query.bidirectional_dijkstra(source, source), (0, [source]))
+
+    def test_astar_heuristic(self):
+        graph = AdjacencyMapGraph(directed=False)
+        grid = {(x, y): Vertex((x, y)) for x in range(5) for y in range(5)}
+        graph.bulk_insert_edges((grid[x, y], grid[x + dx, y + dy], 1) for (x, y) in grid
+                                for dx, dy in ((1, 0), (0, 1)) if (x + dx, y + dy) in grid)
+
+        def manhattan(u, v):
+            return abs(u.value()[0] - v.value()[0]) + abs(u.value()[1] - v.value()[1])
+
+        distance, path = PathQuery(graph).astar(grid[0, 0], grid[4, 3], manhattan)
+        self.assertEqual(distance, 7)
+        self.assertEqual(len(path), 8)
+
+    def test_partially_weighted(self):
+        a, b, c, d = (Vertex(x) for x in 'abcd')
+        for directed in (True, False):
+            graph = AdjacencyMapGraph(directed=directed)
+            for v in (a, b, c, d):
+                graph.insert_vertex(v)
+            graph.bulk_insert_edges([(a, b, 2.0), (b, d, None), (a, c, None), (c, d, 5.0)])
+            query = PathQuery(graph)
+            self.assertEqual(dijkstra(graph, a).distance_to(d), 3.0)
+            self.assertEqual(query.bidirectional_dijkstra(a, d), (3.0, [a, b, d]))
+            self.assertEqual(query.astar(a, d), (3.0, [a, b, d]))
+
+
+class TestMinimumSpanningTree(TestCase):
+
+    def setUp(self):
+        self.v = [Vertex(c) for c in 'abcdef']
+        a, b, c, d, e, f = self.v
+        self.edges = [(a, b, 4), (a, c, 1), (b, c, 2), (b, d, 5), (c, d, 8), (d, e, 3), (f, f, 1)]
+
+    def test_kruskal_and_prim(self):
+        for backend in (EdgeListGraph, AdjacencyMapGraph, CompactEdgeListGraph):
+            graph = backend(directed=False)
+            graph.bulk_insert_edges(self.edges)
+            for algorithm in (kruskal, prim):
+                total, tree = algorithm(graph)
+                self.assertEqual(total, 11)
+                self.assertEqual(len(tree), 4)  # f stays a separate tree
+
+    def test_rejects_directed(self):
+        graph = AdjacencyMapGraph(directed=True)
+        graph.bulk_insert_edges(self.edges)
+        self.assertRaises(ValueError, kruskal, graph)
+
+    def test_disjoint_set(self):
+        sets = DisjointSet(4)
+        self.assertTrue(sets.union(0, 1))
+        self.assertFalse(sets.union(1, 0))
+        self.assertTrue(sets.union(2, 3))
+        self.assertEqual(sets.count(), 2)
+        i = sets.add()
+        sets.union(i, 3)
+        self.assertTrue(sets.connected(2, i))
+        self.assertFalse(sets.connected(0, i))
+
+
+class TestGraphChanges(TestCase):
+
+    def setUp(self):
+        self.v = [Vertex(i) for i in range(6)]
+        self.backends = (EdgeListGraph, AdjacencyListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph,
+                         DenseMatrixGraph, CompactEdgeListGraph)
+
+    def test_change_log(self):
+        v = self.v
+        graph = AdjacencyMapGraph(directed=True)
+        log = ChangeLog(graph)
+        graph.insert_vertex(v[0])
+        graph.insert_vertex(v[1])
+        graph.insert_edge(v[0], v[1], 2.5)
+        graph.remove_edge(graph.get_edge(v[0], v[1]))
+        graph.remove_vertex(v[1])
+        self.assertEqual(list(log), [('insert_vertex', v[0], None, None), ('insert_vertex', v[1], None, None),
+                                     ('insert_edge', v[0], v[1], 2.5), ('remove_edge', v[0], v[1], None),
+                                     ('remove_vertex', v[1], None, None)])
+        self.assertEqual(len(list(log.since(3))), 2)
+        graph.unsubscribe(log)
+        graph.insert_vertex(v[2])
+        self.assertEqual(len(log), 5)
+
+    def test_incremental_components(self):
+        v = self.v
+        for backend in self.backends:
+            for directed in (False, True):
+                graph = backend(directed=directed)
+                graph.bulk_insert_edges([(v[0], v[1], 1), (v[1], v[2], 1)])
+                components = IncrementalComponents(graph)
+                self.assertEqual(components.count(), 1)
+                graph.bulk_insert_edges([(v[3], v[4], 1), (v[2], v[0], 1)])
+                self.assertEqual(components.count(), 2)
+                self.assertTrue(components.connected(v[0], v[2]))
+
+                edge = graph.get_edge(v[0], v[1])
+                graph.remove_edge(edge[0] if isinstance(edge, list) else edge)
+                self.assertTrue(components.connected(v[0], v[1]))  # still joined through v[2]
+                edge = graph.get_edge(v[1], v[2])
+                graph.remove_edge(edge[0] if isinstance(edge, list) else edge)
+                self.assertFalse(components.connected(v[1], v[2]))
+                self.assertEqual(components.count(), 3)
+
+                graph.insert_vertex(v[5])
+                graph.insert_edge(v[1], v[4], 1)
+                graph.insert_edge(v[4], v[5], 1)
+                self.assertEqual(components.count(), 2)
+                graph.remove_vertex(v[4])
+                self.assertEqual(components.count(), 4)
+                self.assertFalse(components.connected(v[1], v[3]))
+                self.assertEqual(sorted(len(c) for c in components.components()), [1, 1, 1, 2])
+
+    def test_incremental_components_vertex_removals(self):
+        rng = random.Random(7)
+        for directed in (False, True):
+            vertices = [Vertex(i) for i in range(40)]
+            graph = AdjacencyMapGraph(directed=directed)
+            for vertex in vertices:
+                graph.insert_vertex(vertex)
+            graph.bulk_insert_edges((rng.choice(vertices), rng.choice(vertices), 1) for _ in range(45))
+            components = IncrementalComponents(graph)
+            for vertex in rng.sample(vertices, 30):
+                graph.remove_vertex(vertex)
+                expected = connected_components(graph)
+                self.assertEqual(components.count(), expected.count)
+                self.assertEqual(sorted(sorted(id(v) for v in c) for c in components.components()),
+                                 sorted(sorted(id(v) for v in c) for c in expected.groups()))
+
+
+class TestEdgeViews(TestCase):
+
+    def test_views_track_mutations(self):
+        v = [Vertex(i) for i in range(4)]
+        for backend in (AdjacencyListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph):
+            for directed in (False, True):
+                graph = backend(directed=directed)
+                graph.bulk_insert_edges([(v[0], v[1], 1), (v[1], v[2], 2), (v[2], v[3], 3)])
+                view = graph.edges()
+                self.assertEqual(len(view), 3)
+                self.assertEqual(len(list(view)), 3)
+                snapshot = graph._edge_cache[1]
+                self.assertEqual(len(list(graph.edges())), 3)
+                self.assertIs(graph._edge_cache[1], snapshot)  # no mutation, no rescan
+
+                graph.insert_edge(v[3], v[0], 4)
+                self.assertEqual(len(view), 4)
+                self.assertEqual(len(list(view)), 4)
+                for edge in view:
+                    self.assertIn(edge, view)
+                self.assertNotIn((v[1], v[3]), view)
+
+
+class TestCentrality(TestCase):
+
+    def setUp(self):
+        self.v = [Vertex(i) for i in range(5)]
+        v = self.v
+        self.graph = AdjacencyMapGraph(directed=True)
+        # v[4] is dangling; v[0] is pointed at by everyone else
+        self.graph.bulk_insert_edges([(v[1], v[0]), (v[2], v[0]), (v[3], v[0]), (v[4], v[0]), (v[0], v[1]),
+                                      (v[1], v[2]), (v[3], v[4])])
+        self.graph.remove_edge(self.graph.get_edge(v[4], v[0]))
+
+    def _both_paths(self, function):
+        """Run function with and without numpy and return both results."""
+        results = [function()]
+        saved, graph_centrality.numpy = graph_centrality.numpy, None
+        try:
+            results.append(function())
+        finally:
+            graph_centrality.numpy = saved
+        return results
+
+    def test_pagerank(self):
+        for result in self._both_paths(lambda: pagerank(self.graph)):
+            self.assertTrue(result.converged)
+            self.assertAlmostEqual(sum(result.scores), 1.0)
+            self.assertEqual(result.top(1)[0][0], self.v[0])
+            self.assertLess(result.score_of(self.v[3]), result.score_of(self.v[4]))
+        numpy_result, python_result = self._both_paths(lambda: pagerank(self.graph))
+        for a, b in zip(numpy_result.scores, python_result.scores):
+            self.assertAlmostEqual(a, b)
+
+    def test_cycle_is_uniform(self):
+        v = self.v
+        graph = AdjacencyMapGraph(directed=True)
+        graph.bulk_insert_edges([(v[i], v[(i + 1) % 5]) for i in range(5)])
+        for result in self._both_paths(lambda: pagerank(graph)):
+            for score in result.scores:
+                self.assertAlmostEqual(score, 0.2)
+
+    def test_warm_start(self):
+        transition = TransitionMatrix(self.graph)
+        cold = pagerank(transition)
+        warm = pagerank(transition, start=cold)
+        self.assertLess(warm.iterations, cold.iterations)
+        new = Vertex(5)
+        self.graph.insert_vertex(new)
+        self.graph.insert_edge(self.v[2], new)
+        self.assertTrue(pagerank(self.graph, start=cold).converged)
+        with self.assertRaises(ValueError):
+            pagerank(self.graph, start=[1, 2])
+
+    def test_in_degree_and_hits(self):
+        for result in self._both_paths(lambda: in_degree_centrality(self.graph)):
+            self.assertAlmostEqual(result.score_of(self.v[0]), 3 / 4)
+        for hubs, authorities in self._both_paths(lambda: hits(self.graph)):
+            self.assertAlmostEqual(sum(hubs.scores), 1.0)
+            self.assertEqual(authorities.top(1)[0][0], self.v[0])
+            self.assertEqual(hubs.score_of(self.v[4]), 0)
+
+
+class TestSubgraphViews(TestCase):
+
+    def setUp(self):
+        self.v = [Vertex(i) for i in range(6)]
+        v = self.v
+        self.pairs = [(v[0], v[1], 1), (v[1], v[2], 2), (v[2], v[3], 3), (v[3], v[4], 4), (v[1], v[5], 5)]
+
+    def test_induced_subgraph(self):
+        v = self.v
+        for backend in (EdgeListGraph, AdjacencyListGraph, AdjacencyMapGraph, AdjacencyMatrixGraph,
+                        DenseMatrixGraph, CompactEdgeListGraph):
+            for directed in (False, True):
+                graph = backend(directed=directed)
+                graph.bulk_insert_edges(self.pairs)
+                view = graph.induced_subgraph([v[1], v[2], v[3], v[5]])
+                self.assertEqual(view.vertex_count(), 4)
+                self.assertEqual(view.edge_count(), 3)
+                self.assertEqual(len(list(view.edges())), 3)
+                self.assertIsNone(view.get_edge(v[0], v[1]))
+                self.assertIsNotNone(view.get_edge(v[1], v[2]))
+                self.assertEqual(view.degree(v[1]), 2)
+                self.assertEqual(sorted(u.value() for u, _ in view.neighbours(v[3], outgoing=False)), [2])
+                with self.assertRaises(TypeError):
+                    view.insert_vertex(v[0])
+
+                graph.insert_edge(v[5], v[3], 6)  # the view follows the parent's edges
+                self.assertEqual(view.edge_count(), 4)
+                frozen = view.freeze()
+                self.assertEqual(frozen.edge_count(), 4)
+                copy = view.materialize(AdjacencyMapGraph)
+                self.assertEqual(copy.edge_count(), 4)
+                self.assertIsNotNone(copy.get_edge(v[5], v[3]))
+
+    def test_k_hop(self):
+        v = self.v
+        graph = AdjacencyMapGraph(directed=True)
+        graph.bulk_insert_edges(self.pairs)
+        self.assertEqual(set(graph.k_hop(v[1], 1).vertices()), {v[1], v[2], v[5]})
+        self.assertEqual(set(graph.k_hop(v[3], 2, outgoing=False).vertices()), {v[1], v[2], v[3]})
+        self.assertEqual(graph.k_hop(v[0], 10).vertex_count(), 6)
+        self.assertEqual(graph.k_hop(v[0], 0).edge_count(), 0)
+
+
+class TestGenerators(TestCase):
+
+    def test_streams(self):
+        pairs = list(gnp(300, 0.05, seed=1))
+        self.assertEqual(pairs, list(gnp(300, 0.05, seed=1)))
+        self.assertTrue(all(i < j for i, j in pairs))
+        self.assertEqual(len(set(pairs)), len(pairs))
+        self.assertLess(abs(len(pairs) - 0.05 * 300 * 299 / 2), 200)
+        self.assertEqual(len(list(gnp(6, 1.0, directed=True))), 30)
+        self.assertEqual(set(gnm(8, 28, seed=2)), {(i, j) for j in range(8) for i in range(j)})
+        directed = list(gnm(8, 56, seed=2, directed=True))
+        self.assertEqual(len(set(directed)), 56)
+        self.assertTrue(all(i != j for i, j in directed))
+        with self.assertRaises(ValueError):
+            list(gnm(4, 7))
+        self.assertEqual(len(list(barabasi_albert(50, 3, seed=3))), 3 * 47)
+        ring = list(watts_strogatz(40, 4, 0.2, seed=4))
+        self.assertEqual(len(set(ring)), 80)
+        for n, k in ((6, 4), (5, 4), (8, 6)):  # vertices soon join every other vertex
+            dense = list(watts_strogatz(n, k, 1.0, seed=0))
+            self.assertEqual(len(set(dense)), len(dense))
+            self.assertEqual(len(dense), n * (k // 2))
+            self.assertTrue(all(i < j for i, j in dense))
+        self.assertEqual(len(list(grid_2d(3, 4))), 17)
+        self.assertEqual(len(list(grid_2d(3, 4, periodic=True))), 24)
+
+    def test_build(self):
+        for directed in (False, True):
+            pairs = list(gnp(60, 0.1, seed=5, directed=directed))
+            csr = build(pairs, 60, directed=directed)
+            self.assertEqual(csr.edge_count(), len(pairs))
+            for i, j in pairs:
+                self.assertIsNotNone(csr.get_edge(csr.vertex_at(i), csr.vertex_at(j)))
+            for backend in (AdjacencyMapGraph, DenseMatrixGraph, CompactEdgeListGraph):
+                graph = build(iter(pairs), 60, backend, directed=directed, weight=1.0)
+                self.assertEqual(graph.vertex_count(), 60)
+                self.assertEqual(graph.edge_count(), len(pairs))
+        loops = build([(0, 0), (0, 1)], 2)
+        self.assertEqual(loops.edge_count(), 2)
+        self.assertEqual(loops.degree(loops.vertex_at(0)), 2)
+
+
+class TestStrongComponents(TestCase):
+
+    def setUp(self):
+        self.v = [Vertex(i) for i in range(8)]
+        v = self.v
+        self.graph = AdjacencyMapGraph(directed=True)
+        # {0, 1, 2} -> {3, 4} -> {5}, plus {6} -> {3, 4} and the lone 7
+        self.graph.bulk_insert_edges([(v[0], v[1]), (v[1], v[2]), (v[2], v[0]), (v[2], v[3]), (v[3], v[4]),
+                                      (v[4], v[3]), (v[4], v[5]), (v[6], v[4]), (v[7], v[7])])
+
+    def test_components(self):
+        v = self.v
+        for graph in (self.graph, self.graph.freeze()):
+            for algorithm in ('tarjan', 'kosaraju'):
+                result = strongly_connected_components(graph, algorithm)
+                self.assertEqual(result.count, 5)
+                self.assertEqual(result.component_of(v[0]), result.component_of(v[2]))
+                self.assertEqual(result.component_of(v[3]), result.component_of(v[4]))
+                self.assertNotEqual(result.component_of(v[2]), result.component_of(v[3]))
+                for u, w in (edge.endpoints() for edge in graph.edges()):
+                    self.assertLessEqual(result.component_of(u), result.component_of(w))
+        with self.assertRaises(ValueError):
+            strongly_connected_components(self.graph, 'nope')
+
+    def test_deep_graph(self):
+        vertices = [Vertex(i) for i in range(20000)]
+        graph = AdjacencyMapGraph(directed=True)
+        graph.bulk_insert_edges(zip(vertices, vertices[1:]))
+        graph.insert_edge(vertices[-1], vertices[0])
+        self.assertEqual(strongly_connected_components(graph).count, 1)
+        self.assertEqual(strongly_connected_components(graph, 'kosaraju').count, 1)
+        self.assertEqual(len(find_cycle(graph)), 20000)
+
+    def test_find_cycle(self):
+        v = self.v
+        cycle = find_cycle(self.graph)
+        self.assertEqual(cycle, [v[0], v[1], v[2]])
+        for a, b in zip(cycle, cycle[1:] + cycle[:1]):
+            self.assertIsNotNone(self.graph.get_edge(a, b))
+        dag = AdjacencyMapGraph(directed=True)
+        dag.bulk_insert_edges([(v[0], v[1]), (v[0], v[2]), (v[1], v[2])])
+        self.assertIsNone(find_cycle(dag))
+        tree = AdjacencyMapGraph()
+        tree.bulk_insert_edges([(v[0], v[1]), (v[1], v[2])])
+        self.assertIsNone(find_cycle(tree))
+        tree.insert_edge(v[2], v[0])
+        self.assertEqual(len(find_cycle(tree)), 3)
+
+    def test_condensation(self):
+        components = strongly_connected_components(self.graph)
+        dag = condensation(self.graph, components)
+        self.assertEqual(dag.vertex_count(), 5)
+        self.assertEqual(dag.edge_count(), 3)
+        self.assertIsNone(find_cycle(dag))
+        self.assertEqual(len(topological_sort(dag)), 5)
+        c = components.component_of
+        self.assertIsNotNone(dag.get_edge(dag.vertex_at(c(self.v[0])), dag.vertex_at(c(self.v[3]))))
+
+
+class TestConcurrentGraph(TestCase):
+
+    def test_readers_share_the_lock(self):
+        lock = ReadWriteLock()
+        inside = threading.Barrier(2, timeout=5)
+
+        def reader():
+            with lock.read():
+                inside.wait()  # both readers must be inside at once to get past this
+
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(inside.broken)
+
+    def test_reads_during_writes(self):
+        vertices = [Vertex(i) for i in range(200)]
+        graph = ConcurrentGraph(AdjacencyMapGraph(directed=True))
+        for v in vertices:
+            graph.insert_vertex(v)
+        errors = []
+        done = threading.Event()
+
+        def writer():
+            rng = random.Random(0)
+            for _ in range(3000):
+                graph.insert_edge(vertices[0], vertices[rng.randrange(200)], 1)
+            done.set()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    edges = graph.incident_edges(vertices[0])
+                    self.assertEqual(len(edges), len({e.opposite(vertices[0]) for e in edges}))
+                    snapshot = graph.snapshot()
+                    self.assertEqual(snapshot.degree(vertices[0]), len(list(snapshot.neighbours(vertices[0]))))
+            except Exception as error:  # reported to the main thread
+                errors.append(error)
+
+        threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(graph.snapshot().edge_count(), graph.edge_count())
+        self.assertIs(graph.snapshot(), graph.snapshot())  # no change, no copy
+
+    def test_listener_reads_the_wrapper(self):
+        v = [Vertex(i) for i in range(4)]
+        graph = ConcurrentGraph(AdjacencyMapGraph())
+        components = IncrementalComponents(graph)
+        counts = []
+
+        def mutate():
+            for vertex in v:
+                graph.insert_vertex(vertex)
+            graph.insert_edge(v[0], v[1])
+            graph.insert_edge(v[1], v[2])
+            graph.remove_edge(graph.get_edge(v[1], v[2]))  # the listener searches the wrapper under the write lock
+            counts.append(components.count())
+
+        thread = threading.Thread(target=mutate, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "listener deadlocked on the write lock")
+        self.assertEqual(counts, [3])
+
+    def test_save_during_writes(self):
+        vertices = [Vertex(i) for i in range(300)]
+        graph = ConcurrentGraph(AdjacencyMapGraph())
+        graph.bulk_insert_edges((vertices[i], vertices[(i + 1) % 300], 1.0) for i in range(300))
+        errors = []
+
+        def writer():
+            for v in vertices[::2]:
+                graph.remove_vertex(v)
+
+        def saver(path):
+            try:
+                for _ in range(20):
+                    graph.save(path)
+                    self.assertEqual(load(path).edge_count(), to_csr(load(path)).edge_count())
+            except Exception as error:  # reported to the main thread
+                errors.append(error)
+
+        with tempfile.TemporaryDirectory() as directory:
+            threads = [threading.Thread(target=writer), threading.Thread(target=saver, args=(directory + '/g',))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(to_csr(graph).edge_count(), 0)
+            self.assertIs(to_csr(graph), graph.snapshot())
+
+    def test_nested_reads_with_waiting_writer(self):
+        graph = ConcurrentGraph(AdjacencyMapGraph())
+        graph.insert_vertex(Vertex(0))
+        results = []
+
+        def nested():
+            with graph.reading():
+                writer = threading.Thread(target=graph.insert_vertex, args=(Vertex(1),), daemon=True)
+                writer.start()
+                while not graph._lock._waiting_writers:  # let the writer queue up behind us
+                    writer.join(0.001)
+                results.append(graph.vertex_count())
+                results.append(graph.snapshot().vertex_count())
+                with self.assertRaises(RuntimeError):  # upgrading would wait on ourselves
+                    graph.insert_vertex(Vertex(2))
+            writer.join()
+            results.append(graph.vertex_count())
+
+        thread = threading.Thread(target=nested, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "nested read deadlocked behind a waiting writer")
+        self.assertEqual(results, [1, 1, 2])
+
+    def test_algorithms_during_writes(self):
+        hub, spokes = Vertex('hub'), [Vertex(i) for i in range(50)]
+        graph = ConcurrentGraph(AdjacencyListGraph())
+        graph.insert_vertex(hub)
+        errors = []
+        done = threading.Event()
+
+        def writer():
+            while not done.is_set():  # spokes keep joining the hub and leaving again
+                for v in spokes:
+                    graph.insert_edge(hub, v)
+                for v in spokes:
+                    graph.remove_vertex(v)
+
+        def reader():
+            try:
+                for _ in range(300):
+                    self.assertEqual(connected_components(graph).count, 1)
+                    self.assertNotIn(inf, bfs(graph, hub).distance)
+            except Exception as error:  # reported to the main thread
+                errors.append(error)
+            finally:
+                done.set()
+
+        threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
@@ -0,0 +1,62 @@
+"""Compare ExpressionTree.evaluate with the compiled forms of the same tree.
+
+Two shapes are timed: a deep expression, one long chain of operators, and
+a wide one, a sum of many short products over several variables:
+
+    python benchmark.py --terms 50 200 --repeat 2000
+"""
+import argparse
+from time import perf_counter
+
+from main import ExpressionTree
+
+MODES = ('closure', 'source', 'postfix')
+
+
+def deep(terms):
+    return ' - '.join(['x'] + [str(k % 9 + 1) for k in range(terms)])
+
+
+def wide(terms):
+    names = 'abcdefgh'
+    return ' + '.join(f"{names[k % len(names)]} * {k % 7 + 1}" for k in range(terms))
+
+
+SHAPES = {'deep': deep, 'wide': wide}
+
+
+def _time(function, repeat):
+    start = perf_counter()
+    for _ in range(repeat):
+        function()
+    return (perf_counter() - start) / repeat
+
+
+def run_benchmarks(terms, repeat):
+    """Return one row (shape, terms, mode, seconds per call, speedup over evaluate) per measurement."""
+    variables = {name: float(k + 2) for k, name in enumerate('abcdefghx')}
+    rows = []
+    for shape, make in SHAPES.items():
+        for n in terms:
+            tree = ExpressionTree(make(n))
+            baseline = _time(lambda: tree.evaluate(variables), repeat)
+            rows.append((shape, n, 'evaluate', baseline, 1.0))
+            for mode in MODES:
+                function = tree.compile(mode)
+                assert function(variables) == tree.evaluate(variables)
+                seconds = _time(lambda: function(variables), repeat)
+                rows.append((shape, n, mode, seconds, baseline / seconds))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--terms', type=int, nargs='+', default=[10, 100, 400])
+    parser.add_argument('--repeat', type=int, default=1000, help="calls timed per measurement")
+    args = parser.parse_args()
+    for shape, n, mode, seconds, speedup in run_benchmarks(args.terms, args.repeat):
+        print(f"{shape:>5} terms={n:<5} {mode:>9} {seconds * 1e6:>10.2f} us/call {speedup:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,80 +1,703 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from re import findall
+import operator
+import re
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import total_ordering
+from itertools import repeat
+from math import isfinite
+from threading import Lock
 
-@dataclass(order=True)
+try:
+    import numpy
+except ImportError:  # evaluate_batch falls back to array('d') columns
+    numpy = None
+
+
+def _power(base: float, exponent: float) -> float:
+    """base ** exponent, except that a negative base raised to a fractional
+    exponent raises ValueError instead of giving a complex number."""
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ValueError("a negative number cannot be raised to a fractional power")
+    return result
+
+
+OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv, '**': _power}
+
+
+# Left and right binding powers: '+' binds less tightly than '*', both are
+# left-associative (left < right) and '**' is right-associative (left > right)
+BINDING_POWER = {'+': (1, 2), '-': (1, 2), '*': (3, 4), '/': (3, 4), '**': (8, 7)}
+# Prefix minus binds tighter than '*' and less than '**', so -2 ** 2 is -(2 ** 2)
+UNARY_MINUS, UNARY_MINUS_POWER = 'u-', 5
+
+_SPACE = re.compile(r'\s*')
+_TOKEN = re.compile(r'\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z_]\w*)|(\*\*|[-+*/()]))')
+
+
+def tokenize(expr: str) -> Iterator[str]:
+    """Yield the tokens of expr one at a time: numbers (integer or decimal),
+    variable names, operators and parentheses."""
+    position, end = 0, len(expr)
+    while position < end:
+        match = _TOKEN.match(expr, position)
+        if match is None or match.lastindex is None:
+            position = _SPACE.match(expr, position).end()
+            if position == end:  # only trailing whitespace was left
+                return
+            raise ValueError(f"unexpected character {expr[position]!r} at position {position}")
+        position = match.end()
+        yield match.group(match.lastindex)
+
+
+def is_number(token: str) -> bool:
+    """Tokens are never negative numbers, but constants folded by optimize() can be."""
+    return token[0].isdigit() or token[0] == '.' or (token[0] == '-' and len(token) > 1)
+
+
+def is_operand(token: str) -> bool:
+    """Numbers and variable names are operands; everything else is an operator."""
+    return is_number(token) or token.isidentifier()
+
+
+@total_ordering
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
 class ExpressionNode:
+    """Immutable node of an expression tree. Equality, ordering, hashing
+    and repr walk the tree with explicit stacks rather than recursing like
+    the dataclass-generated methods, so they work at any depth; the hash is
+    computed once per node and cached."""
     value: str
     left: ExpressionNode | None = None
     right: ExpressionNode | None = None
+    _hash: int | None = field(default=None, init=False)
 
     def get_children(self) -> tuple[ExpressionNode | None, ExpressionNode | None]:
         return self.left, self.right
 
+    def __hash__(self) -> int:
+        stack = [self]
+        while stack:  # hash the children first, so hash() below never recurses
+            node = stack[-1]
+            pending = [child for child in node.get_children() if child is not None and child._hash is None]
+            if pending and node._hash is None:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if node._hash is None:
+                object.__setattr__(node, '_hash', hash((node.value, hash(node.left), hash(node.right))))
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ExpressionNode):
+            return NotImplemented
+        pairs = [(self, other)]
+        while pairs:
+            a, b = pairs.pop()
+            if a is b:  # shared subtrees need no walk
+                continue
+            if a is None or b is None or a.value != b.value:
+                return False
+            if a._hash is not None and b._hash is not None and a._hash != b._hash:
+                return False
+            pairs.append((a.right, b.right))
+            pairs.append((a.left, b.left))
+        return True
+
+    def __lt__(self, other: ExpressionNode) -> bool:
+        """Order by the preorder sequence of values, empty children written
+        as ''; the sequence is prefix-free, so it identifies the tree."""
+        if not isinstance(other, ExpressionNode):
+            return NotImplemented
+        for a, b in zip(self.__preorder(), other.__preorder()):
+            if a != b:
+                return a < b
+        return False
+
+    def __preorder(self) -> Iterator[str]:
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                yield ''
+            else:
+                yield node.value
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def __repr__(self) -> str:
+        parts = []
+        stack: list[ExpressionNode | str | None] = [self]
+        while stack:
+            item = stack.pop()
+            if item is None or isinstance(item, str):
+                parts.append('None' if item is None else item)
+            else:
+                parts.append(f"ExpressionNode(value={item.value!r}, left=")
+                stack.extend((')', item.right, ', right=', item.left))
+        return ''.join(parts)
+
+
+class Program:
+    """An expression tree assembled into postfix opcodes for a stack machine:
+
+    0 pushes constants[argument], 1 pushes the variable names[argument],
+    2 pushes saved[argument], 3 copies the top value into saved[argument],
+    4 and up apply the binary operator functions[opcode - 4] to the top two
+    values. A subtree shared by several parents (see optimize()) is emitted
+    once, saved, and reloaded afterwards. depth is the largest number of
+    values on the stack and slots the number of saved values."""
+    __slots__ = 'code', 'constants', 'names', 'depth', 'slots'
+
+    def __init__(self, root: ExpressionNode | None) -> None:
+        opcodes, arguments, self.constants, self.names = array('B'), array('q'), [], []
+        uses = _use_counts(root)
+        saved_at: dict[int, int] = {}  # id(shared node) -> its slot in saved
+        constants, names = self.constants, self.names
+        depth = deepest = 0
+        stack = [(root, False)] if root is not None else []
+        while stack:  # postorder walk
+            node, expanded = stack.pop()
+            if node.left is None:
+                if is_number(node.value):
+                    opcodes.append(0)
+                    arguments.append(len(constants))
+                    constants.append(float(node.value))
+                else:
+                    opcodes.append(1)
+                    arguments.append(len(names))
+                    names.append(node.value)
+                depth += 1
+            elif expanded:
+                opcodes.append(4 + OPERATOR_CODES[node.value])
+                arguments.append(0)
+                depth -= 1
+                if uses[id(node)] > 1:
+                    saved_at[id(node)] = len(saved_at)
+                    opcodes.append(3)
+                    arguments.append(saved_at[id(node)])
+                continue
+            elif id(node) in saved_at:
+                opcodes.append(2)
+                arguments.append(saved_at[id(node)])
+                depth += 1
+            else:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            if depth > deepest:
+                deepest = depth
+        self.depth = deepest
+        self.code = list(zip(opcodes, arguments))
+        self.slots = len(saved_at)
+
+    def run(self, functions: Sequence[Callable], fetch: Callable[[str], object], values: list, saved: list):
+        """Execute the program on the preallocated lists values (at least
+        depth long) and saved (at least slots long), applying functions to
+        the operators and fetch to the variable names."""
+        constants, names = self.constants, self.names
+        top = -1
+        for opcode, argument in self.code:
+            if opcode == 0:
+                top += 1
+                values[top] = constants[argument]
+            elif opcode == 1:
+                top += 1
+                values[top] = fetch(names[argument])
+            elif opcode == 2:
+                top += 1
+                values[top] = saved[argument]
+            elif opcode == 3:
+                saved[argument] = values[top]
+            else:
+                top -= 1
+                values[top] = functions[opcode - 4](values[top], values[top + 1])
+        return values[0] if top == 0 else 0
+
+
+# Rows on which NumPy would quietly give inf or nan where evaluate() raises, with its error
+_ROW_ERRORS = {
+    operator.truediv: ((lambda left, right: right == 0, ZeroDivisionError, "float division by zero"),),
+    _power: ((lambda left, right: (left == 0) & (right < 0), ZeroDivisionError,
+              "0.0 cannot be raised to a negative power"),
+             (lambda left, right: (left < 0) & numpy.isfinite(right) & (numpy.floor(right) != right), ValueError,
+              "a negative number cannot be raised to a fractional power")),
+}
+
+
+def _columnwise(function: Callable[[float, float], float]) -> Callable:
+    """Lift a binary operator to columns: NumPy arrays broadcast by
+    themselves, array('d') columns are mapped over, constants repeated.
+    Either way a row that makes evaluate() raise ZeroDivisionError or
+    ValueError raises it here too."""
+    row_errors = _ROW_ERRORS.get(function, ())
+
+    def apply(left, right):
+        if numpy is not None:
+            for condition, error, message in row_errors:
+                if numpy.any(condition(left, right)):
+                    raise error(message)
+            return function(left, right)
+        if isinstance(left, float) and isinstance(right, float):
+            return function(left, right)
+        return array('d', map(function, repeat(left) if isinstance(left, float) else left,
+                              repeat(right) if isinstance(right, float) else right))
+    return apply
+
+
+OPERATOR_CODES = {op: code for code, op in enumerate(OPERATORS)}
+SCALAR_FUNCTIONS = list(OPERATORS.values())
+COLUMN_FUNCTIONS = [_columnwise(function) for function in OPERATORS.values()]
+
+
+def _lookup(variables: Mapping[str, float] | None, name: str) -> float:
+    """Return variables[name], raising KeyError naming the variable if it has no value."""
+    try:
+        return variables[name]
+    except (KeyError, TypeError):
+        raise KeyError(f"no value given for variable {name!r}") from None
+
+
+_MISSING = object()
+
+
+class ParseCache:
+    """Bounded LRU cache of parsed expressions, keyed by the token stream of
+    the source text, so texts differing only in spacing share one entry (a
+    text that does not tokenize raises the ValueError of parse() before the
+    cache is touched). Entries are tree roots, whose nodes are
+    frozen, so one parse can be shared by every ExpressionTree built from the
+    same text, across threads."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[str, ExpressionNode | None] = OrderedDict()
+        self.__lock = Lock()
+
+    @staticmethod
+    def normalize(expr: str) -> str:
+        return ' '.join(tokenize(expr))
+
+    def lookup(self, expr: str, parse: Callable[[str], ExpressionNode | None]):
+        """Return the cached parse of expr, calling parse(expr) on a miss."""
+        key = self.normalize(expr)
+        with self.__lock:
+            entry = self.__entries.get(key, _MISSING)
+            if entry is not _MISSING:  # an empty expression caches None
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = parse(key)  # outside the lock; two threads may parse the same text once each
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+        return entry
+
+    def warm(self, path: str) -> int:
+        """Parse every expression listed in path, one per line, skipping blank
+        lines and lines starting with '#'. Returns the number of lines read."""
+        count = 0
+        with open(path) as file:
+            for line in file:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    self.lookup(line, ExpressionTree.parse)
+                    count += 1
+        return count
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+
+PARSE_CACHE = ParseCache()
+
 
 class ExpressionTree:
     def __init__(self, expr: str) -> None:
-        self.__expr: list[str] = self.__tokenize(expr)
-        self.__root: ExpressionNode | None = self.__build_tree(self.__expr)
-        
-    def evaluate(self) -> float:
-        def _eval(node: ExpressionNode | None) -> float:
-            if node is None:
-                return 0
-            left, right = node.get_children()
-            if left is None and right is None:
-                return float(node.value)
-            val_left, val_right = _eval(left), _eval(right)
-            match node.value:
-                case '+':
-                    return val_left + val_right
-                case '-':
-                    return val_left - val_right
-                case '*':
-                    return val_left * val_right
-                case '/':
-                    return val_left / val_right
-                case '**':
-                    return val_left ** val_right
-        return _eval(self.__root)
+        self.__setup(PARSE_CACHE.lookup(expr, self.parse))
+
+    def __setup(self, root: ExpressionNode | None) -> None:
+        self.__root: ExpressionNode | None = root
+        self.__program: Program | None = None  # assembled on the first evaluate()
+        self.__values: list = []  # value stack reused by every evaluate()
+        self.__saved: list = []
+        self.__busy = Lock()  # held while a call is using __values
+
+    @classmethod
+    def parse(cls, expr: str) -> ExpressionNode | None:
+        """Return the root of the tree of expr, bypassing the cache."""
+        return cls.__parse_tokens(tokenize(expr))
+
+    @classmethod
+    def from_root(cls, root: ExpressionNode | None) -> ExpressionTree:
+        """Wrap an existing tree (or DAG) of nodes without parsing anything."""
+        tree = cls.__new__(cls)
+        tree.__setup(root)
+        return tree
+
+    def optimize(self) -> tuple[ExpressionTree, OptimizationReport]:
+        """Return an optimized copy of this expression and a report of what
+        changed; see the module-level optimize()."""
+        root, report = optimize(self.__root)
+        return self.from_root(root), report
+
+    def evaluate(self, variables: Mapping[str, float] | None = None) -> float:
+        """Evaluate the expression, looking its variables up in variables.
+
+        The tree is assembled once into a postfix program, which every call
+        runs with an explicit value stack: no recursion, so any depth works,
+        and the stack is allocated once per tree and reused (a call made
+        while another thread is using it gets a fresh one)."""
+        program = self.__assembled()
+        fetch = self.__fetcher(variables)
+        if not self.__busy.acquire(blocking=False):
+            return program.run(SCALAR_FUNCTIONS, fetch, [None] * program.depth, [None] * program.slots)
+        try:
+            return program.run(SCALAR_FUNCTIONS, fetch, self.__values, self.__saved)
+        finally:
+            self.__busy.release()
+
+    def __assembled(self) -> Program:
+        if self.__program is None:
+            program = Program(self.__root)
+            self.__values, self.__saved = [None] * program.depth, [None] * program.slots
+            self.__program = program
+        return self.__program
 
     @staticmethod
-    def __build_tree( postfix: list[str]) -> ExpressionNode:
-        stack = []
+    def __fetcher(variables: Mapping | None) -> Callable[[str], object]:
+        def fetch(name: str):
+            try:
+                return variables[name]
+            except (KeyError, TypeError):
+                return _lookup(variables, name)
+        return fetch
 
-        for token in postfix:
-            if token.isnumeric():
-                stack.append(ExpressionNode(token))
-            else:
-                stack.append(ExpressionNode(value=token, right=stack.pop(), left=stack.pop()))
+    def evaluate_batch(self, columns: Mapping[str, Sequence[float]]):
+        """Evaluate the expression for every row of columns, a mapping from
+        variable name to a column of values (a NumPy array, an array buffer
+        or any sequence of numbers), all columns having the same length.
+
+        The program of evaluate() is run once with whole columns as values,
+        so each node is computed over every row at once: with NumPy the
+        columns are arrays and every operator is one vectorized call; without
+        it each node maps the operator over the columns into an array('d').
+        Returns a new NumPy array or array('d'), never one of the columns
+        given. Like evaluate(), and whether or not NumPy is installed, a
+        division by zero in any row raises ZeroDivisionError and a negative
+        number raised to a fractional power raises ValueError."""
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"columns have different lengths: {sorted(lengths)}")
+        rows = lengths.pop() if lengths else 1
+        if numpy is not None:
+            columns = {name: numpy.asarray(column, dtype=float) for name, column in columns.items()}
+        else:
+            columns = {name: array('d', column) for name, column in columns.items()}
+        program = self.__assembled()
+        result = program.run(COLUMN_FUNCTIONS, self.__fetcher(columns), [None] * program.depth, [None] * program.slots)
+        if isinstance(result, (int, float)):  # no variables: the same value for every row
+            return numpy.full(rows, float(result)) if numpy is not None else array('d', [result]) * rows
+        if any(result is column for column in columns.values()):  # a bare variable, maybe the caller's array
+            return numpy.array(result) if numpy is not None else array('d', result)
+        return result
 
-        return stack.pop()
+    def compile(self, mode: str = 'closure') -> Callable[[Mapping[str, float] | None], float]:
+        """Turn the tree into a function of the variable mapping that gives the
+        same result as evaluate() without walking the tree again. mode picks
+        the implementation:
 
-    def __tokenize(self,expr: str) -> list[str]:
-        return self.__infix_to_postfix(findall(r'\d+|[-+*/()]+', expr))
-        #return self.__infix_to_postfix([op for op in expr.split() if op.strip()]) # without using regex
+        - 'closure': one nested closure per node, the operator function bound
+          in advance;
+        - 'source': the tree rendered as straight-line Python and compiled to
+          bytecode with the builtin compile();
+        - 'postfix': a flat opcode array run by a stack-machine loop.
+
+        Subtrees shared by an optimized expression (see optimize()) are
+        computed once per call by 'source' and 'postfix'; 'closure' shares
+        the closures but calls them once per use, and its calls nest as deep
+        as the tree, so very deep trees need one of the other two."""
+        if mode == 'closure':
+            return self.__closure(self.__root, {})
+        if mode == 'source':
+            namespace = {'lookup': _lookup, 'power': _power}
+            exec(compile(self.__source(self.__root), '<expression>', 'exec'), namespace)
+            return namespace['evaluate']
+        if mode == 'postfix':
+            program, fetcher = Program(self.__root), self.__fetcher
+            return lambda variables=None: program.run(SCALAR_FUNCTIONS, fetcher(variables),
+                                                      [None] * program.depth, [None] * program.slots)
+        raise ValueError(f"unknown compile mode {mode!r}, expected 'closure', 'source' or 'postfix'")
+
+    @classmethod
+    def __closure(cls, node: ExpressionNode | None, built: dict[int, Callable]) -> Callable:
+        if node is None:
+            return lambda variables=None: 0
+        if id(node) in built:
+            return built[id(node)]
+        left, right = node.get_children()
+        if left is None and right is None:
+            if is_number(node.value):
+                constant = float(node.value)
+                return lambda variables=None: constant
+            name = node.value
+
+            def variable(variables=None):
+                try:
+                    return variables[name]
+                except (KeyError, TypeError):
+                    return _lookup(variables, name)
+            return variable
+        function, left, right = OPERATORS[node.value], cls.__closure(left, built), cls.__closure(right, built)
+        built[id(node)] = lambda variables=None: function(left(variables), right(variables))
+        return built[id(node)]
+
+    @staticmethod
+    def __source(root: ExpressionNode | None) -> str:
+        """Render the tree as straight-line code, one temporary per operator,
+        so deep trees do not run into the parser's nesting limit. Variables
+        are read into locals first, in the order evaluate() fetches them."""
+        if root is None:
+            return "def evaluate(v=None):\n    return 0\n"
+        lines = []
+        names: dict[str, str] = {}  # variable name -> its local
+        rendered: dict[int, str] = {}  # id(node) -> its text, a temporary for operators
+        stack = [(root, False)]
+        while stack:  # postorder walk; shared subtrees are rendered once
+            node, expanded = stack.pop()
+            if id(node) in rendered:
+                continue
+            if node.left is None and node.right is None:
+                if is_number(node.value):
+                    rendered[id(node)] = f"({float(node.value)!r})"
+                else:
+                    rendered[id(node)] = names.setdefault(node.value, f"n{len(names)}")
+            elif not expanded:
+                stack.extend(((node, True), (node.right, False), (node.left, False)))
+            else:
+                left, right = rendered[id(node.left)], rendered[id(node.right)]
+                expression = f"power({left}, {right})" if node.value == '**' else f"{left} {node.value} {right}"
+                lines.append(f"    t{len(lines)} = {expression}")
+                rendered[id(node)] = f"t{len(lines) - 1}"
+        result = rendered[id(root)]
+        if names:
+            local_names, quoted = ", ".join(names.values()), ", ".join(map(repr, names))
+            lines[:0] = ["    try:",
+                         f"        {local_names}, = {', '.join(f'v[{name!r}]' for name in names)},",
+                         "    except (KeyError, TypeError):  # lookup raises the KeyError of evaluate()",
+                         f"        {local_names}, = [lookup(v, name) for name in ({quoted},)]"]
+        return "def evaluate(v=None):\n" + "\n".join(lines + [f"    return {result}"]) + "\n"
 
     @staticmethod
-    def __infix_to_postfix(tokens: list[str]) -> list[str]:
-        precedence = {'+': 1, '-': 1, '*': 2, '/': 2, '**': 3} # value of precedence for each operator
-        stack = [] # local stack of operands and operators
-        output = [] # local output
+    def __parse_tokens(tokens: Iterator[str]) -> ExpressionNode | None:
+        """Build the tree straight from the token stream in one pass.
+
+        This is Pratt parsing with an explicit stack instead of recursion:
+        every operator has a left and a right binding power, and an operator
+        waiting on the stack is applied as soon as the next one binds less
+        tightly than it does. Nesting depth, whether from parentheses or from
+        right-associative chains, is then limited only by memory."""
+        operands: list[ExpressionNode] = []
+        waiting: list[str] = []  # operators, UNARY_MINUS and '(' markers
+        expect_operand = True
+        empty = True  # no token at all, which parses to None
+
+        def _reduce() -> None:
+            op = waiting.pop()
+            right = operands.pop()
+            left = ExpressionNode('0') if op == UNARY_MINUS else operands.pop()
+            operands.append(ExpressionNode(value='-' if op == UNARY_MINUS else op, left=left, right=right))
+
         for token in tokens:
-            if token.isnumeric():
-                output.append(token)
-            elif token in precedence:
-                while stack and precedence.get(stack[-1], 0) >= precedence.get(token, 0):
-                    output.append(stack.pop())
-                stack.append(token)
+            empty = False
+            if expect_operand:
+                if is_operand(token):
+                    operands.append(ExpressionNode(token))
+                    expect_operand = False
+                elif token == '(':
+                    waiting.append(token)
+                elif token == '-':
+                    waiting.append(UNARY_MINUS)
+                elif token != '+':  # unary plus changes nothing
+                    raise ValueError(f"expected a number, a variable or '(' but found {token!r}")
+            elif token == ')':
+                while waiting and waiting[-1] != '(':
+                    _reduce()
+                if not waiting:
+                    raise ValueError("unbalanced ')'")
+                waiting.pop()
+            elif token in BINDING_POWER:
+                left_power = BINDING_POWER[token][0]
+                while waiting and waiting[-1] != '(' and (
+                        UNARY_MINUS_POWER if waiting[-1] == UNARY_MINUS else BINDING_POWER[waiting[-1]][1]) > left_power:
+                    _reduce()
+                waiting.append(token)
+                expect_operand = True
             else:
-                output.append('0')
-        while stack:
-            output.append(stack.pop())
-        return output
+                raise ValueError(f"expected an operator or ')' but found {token!r}")
+        if expect_operand and not empty:  # also catches input of only unary plus signs
+            raise ValueError("expression ends with an operator")
+        while waiting:
+            if waiting[-1] == '(':
+                raise ValueError("unbalanced '('")
+            _reduce()
+        return operands[0] if operands else None
+
+    def postfix(self) -> list[str]:
+        """Return the tokens of the expression in postfix order."""
+        tokens = []
+        stack = [self.__root] if self.__root is not None else []
+        while stack:  # right-to-left preorder, reversed below
+            node = stack.pop()
+            tokens.append(node.value)
+            stack.extend(child for child in node.get_children() if child is not None)
+        tokens.reverse()
+        return tokens
 
     def __str__(self):
-        return f"ExpressionTree({self.__expr})\n{self.__root}\nEvaluation: {self.evaluate()}"
+        postfix = self.postfix()
+        text = f"ExpressionTree({postfix})\n{self.__root}"
+        if not any(token.isidentifier() for token in postfix):
+            text += f"\nEvaluation: {self.evaluate()}"
+        return text
+
+@dataclass(frozen=True)
+class OptimizationReport:
+    """What optimize() did: nodes counts the tree as written, every use of a
+    shared subtree included, and unique_nodes the nodes actually stored."""
+    nodes_before: int
+    nodes_after: int
+    unique_nodes_before: int
+    unique_nodes_after: int
+    folded: int
+    simplified: int
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of stored nodes removed."""
+        return 1 - self.unique_nodes_after / self.unique_nodes_before if self.unique_nodes_before else 0.0
+
+
+def _use_counts(root: ExpressionNode | None) -> dict[int, int]:
+    """Return id(node) -> number of parents (1 for the root) for every operator node."""
+    uses: dict[int, int] = {}
+    stack = [root] if root is not None and root.left is not None else []
+    while stack:
+        node = stack.pop()
+        key = id(node)
+        if key in uses:
+            uses[key] += 1
+            continue
+        uses[key] = 1
+        for child in (node.left, node.right):
+            if child.left is not None:  # operators always have both children; leaves are not counted
+                stack.append(child)
+    return uses
+
+
+def _sizes(root: ExpressionNode | None) -> tuple[int, int]:
+    """Return (tree size, unique node count) of a tree or DAG in linear time."""
+    size: dict[int, int] = {}
+    stack = [(root, False)] if root is not None else []
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in size:
+            continue
+        children = [child for child in node.get_children() if child is not None]
+        if expanded or not children:
+            size[id(node)] = 1 + sum(size[id(child)] for child in children)
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+    return (size[id(root)] if root is not None else 0), len(size)
+
+
+def _constant(node: ExpressionNode) -> float | None:
+    if node.left is None and node.right is None and is_number(node.value):
+        return float(node.value)
+    return None
+
+
+# (operator, side of the neutral constant, constant): the other side is the result
+_IDENTITIES = {('+', 'left', 0.0), ('+', 'right', 0.0), ('-', 'right', 0.0), ('*', 'left', 1.0),
+               ('*', 'right', 1.0), ('/', 'right', 1.0), ('**', 'right', 1.0)}
+
+
+def optimize(root: ExpressionNode | None) -> tuple[ExpressionNode | None, OptimizationReport]:
+    """Return an optimized equivalent of the tree rooted at root and a report.
+
+    In one postorder pass, operators whose operands are both constants are
+    folded into a constant (unless that raises or gives inf, nan or a complex
+    number), the identities x + 0, 0 + x, x - 0, x * 1, 1 * x, x / 1 and
+    x ** 1 are reduced to x, and identical subtrees are hash-consed: every
+    node is looked up by (value, left, right) and reused if already built,
+    so the result is a DAG in which each distinct subexpression is stored,
+    and evaluated, once."""
+    nodes_before, unique_before = _sizes(root)
+    canonical: dict[tuple, ExpressionNode] = {}
+    done: dict[int, ExpressionNode] = {}  # id(original node) -> optimized node
+    folded = simplified = 0
+
+    def _intern(node: ExpressionNode) -> ExpressionNode:
+        if node.left is None and node.right is None:
+            number = _constant(node)
+            key = ('number', number) if number is not None else ('name', node.value)
+        else:
+            key = (node.value, id(node.left), id(node.right))
+        return canonical.setdefault(key, node)
+
+    stack = [(root, False)] if root is not None else []
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in done:
+            continue
+        if node.left is None and node.right is None:
+            done[id(node)] = _intern(node)
+            continue
+        if not expanded:
+            stack.extend(((node, True), (node.right, False), (node.left, False)))
+            continue
+        left, right = done[id(node.left)], done[id(node.right)]
+        a, b = _constant(left), _constant(right)
+        result = None
+        if a is not None and b is not None:
+            try:
+                value = OPERATORS[node.value](a, b)
+            except (ArithmeticError, ValueError):
+                value = None
+            if isinstance(value, float) and isfinite(value):
+                result = _intern(ExpressionNode(repr(value)))
+                folded += 1
+        if result is None:
+            if (node.value, 'left', a) in _IDENTITIES:
+                result = right
+            elif (node.value, 'right', b) in _IDENTITIES:
+                result = left
+            if result is not None:
+                simplified += 1
+        if result is None:
+            result = _intern(ExpressionNode(node.value, left, right))
+        done[id(node)] = result
+
+    new_root = done[id(root)] if root is not None else None
+    nodes_after, unique_after = _sizes(new_root)
+    return new_root, OptimizationReport(nodes_before, nodes_after, unique_before, unique_after, folded, simplified)
+
 
 if __name__ == '__main__':
     exp = "5 + 5 ** 2 + 3"
@@ -0,0 +1,261 @@
+from main import *
+import main
+
+import os
+import tempfile
+from array import array
+from dataclasses import FrozenInstanceError
+
+from unittest import TestCase
+
+
+class TestParsing(TestCase):
+
+    def evaluate(self, expr, **variables):
+        return ExpressionTree(expr).evaluate(variables)
+
+    def test_tokenize(self):
+        self.assertEqual(list(tokenize("2**x1 -( .5+3.25)")), ['2', '**', 'x1', '-', '(', '.5', '+', '3.25', ')'])
+        self.assertEqual(list(tokenize("   ")), [])
+
+    def test_precedence(self):
+        self.assertEqual(self.evaluate("2 + 3 * 4"), 14)
+        self.assertEqual(self.evaluate("(2 + 3) * 4"), 20)
+        self.assertEqual(self.evaluate("2 * 3 ** 2"), 18)
+        self.assertEqual(self.evaluate("1 + 6 / 3 - 1"), 2)
+        self.assertEqual(ExpressionTree("2 + 3 * 4").postfix(), ['2', '3', '4', '*', '+'])
+
+    def test_associativity(self):
+        self.assertEqual(self.evaluate("10 - 4 - 3"), 3)
+        self.assertEqual(self.evaluate("8 / 4 / 2"), 1)
+        self.assertEqual(self.evaluate("2 ** 3 ** 2"), 512)  # right-associative
+        self.assertEqual(ExpressionTree("2 ** 3 ** 2").postfix(), ['2', '3', '2', '**', '**'])
+
+    def test_unary_and_decimals(self):
+        self.assertEqual(self.evaluate("-2 ** 2"), -4)
+        self.assertEqual(self.evaluate("2 * -3"), -6)
+        self.assertEqual(self.evaluate("--x", x=5), 5)
+        self.assertEqual(self.evaluate("+3"), 3)
+        self.assertEqual(self.evaluate("1.5 * .5"), 0.75)
+
+    def test_variables(self):
+        self.assertEqual(self.evaluate("rate * (x_1 + 2)", rate=0.5, x_1=4), 3)
+        with self.assertRaisesRegex(KeyError, "no value given for variable 'y'"):
+            ExpressionTree("x + y").evaluate({'x': 1})
+        with self.assertRaises(KeyError):
+            ExpressionTree("x").evaluate()
+
+    def test_errors(self):
+        for expr in ("2 +", "(2 + 3", "2 + 3)", "2 $ 3", "* 2", "2 3", "()", "x (", "2 + * 3", "+", "+ + +", "(+)"):
+            with self.assertRaises(ValueError, msg=expr):
+                ExpressionTree.parse(expr)
+        with self.assertRaises(ZeroDivisionError):
+            self.evaluate("1 / (2 - 2)")
+
+    def test_empty(self):
+        self.assertIsNone(ExpressionTree.parse("  "))
+        self.assertEqual(ExpressionTree("").evaluate(), 0)
+        self.assertEqual(ExpressionTree("").postfix(), [])
+
+
+class TestExpressionNode(TestCase):
+
+    def test_immutable(self):
+        root = ExpressionTree.parse("1 + 2")
+        with self.assertRaises(FrozenInstanceError):
+            root.value = '-'
+
+    def test_equality_and_hash(self):
+        a, b, c = ExpressionTree.parse("x * (y + 1)"), ExpressionTree.parse("x*(y+1)"), ExpressionTree.parse("x * (y + 2)")
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(a, c)
+        self.assertEqual(len({a, b, c}), 2)
+        self.assertTrue(a < c)
+        self.assertEqual(repr(ExpressionTree.parse("1 + x")),
+                         "ExpressionNode(value='+', left=ExpressionNode(value='1', left=None, right=None), "
+                         "right=ExpressionNode(value='x', left=None, right=None))")
+
+
+class TestDeepExpressions(TestCase):
+
+    def test_long_chain(self):
+        terms = 100000
+        tree = ExpressionTree(" - ".join(['x'] + ['1'] * terms))
+        self.assertEqual(tree.evaluate({'x': terms}), 0)
+        for mode in ('source', 'postfix'):
+            self.assertEqual(tree.compile(mode)({'x': terms}), 0)
+        self.assertEqual(tree.evaluate_batch({'x': [terms, terms + 1]})[1], 1)
+
+    def test_deep_nesting(self):
+        depth = 20000
+        left, right = ExpressionTree.parse("(" * depth + "x" + ")" * depth), ExpressionTree.parse("x")
+        self.assertEqual(left, right)
+        chain = " ** ".join(['1'] * depth)  # right-associative, so the tree leans right
+        first, second = ExpressionTree.parse(chain), ExpressionTree.parse(chain)
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertFalse(first < second)
+        self.assertTrue(repr(first).startswith("ExpressionNode(value='**'"))
+        self.assertEqual(ExpressionTree.from_root(first).evaluate(), 1)
+
+
+class TestEvaluateBatch(TestCase):
+
+    def _both_paths(self, function):
+        """Run function with and without numpy and return both results."""
+        results = [function()]
+        saved, main.numpy = main.numpy, None
+        try:
+            results.append(function())
+        finally:
+            main.numpy = saved
+        return results
+
+    def test_matches_evaluate(self):
+        tree = ExpressionTree("x * y - x / 2 + y ** 2")
+        columns = {'x': [1.0, 2.0, 4.0], 'y': array('d', [3.0, -1.0, 0.5])}
+        expected = [tree.evaluate({'x': x, 'y': y}) for x, y in zip(columns['x'], columns['y'])]
+        for result in self._both_paths(lambda: tree.evaluate_batch(columns)):
+            self.assertEqual(list(result), expected)
+
+    def test_constants_and_lengths(self):
+        for result in self._both_paths(lambda: ExpressionTree("2 * 3").evaluate_batch({'x': [1, 2, 3, 4]})):
+            self.assertEqual(list(result), [6.0] * 4)
+        with self.assertRaises(ValueError):
+            ExpressionTree("x + y").evaluate_batch({'x': [1, 2], 'y': [1]})
+
+    def test_division_by_zero(self):
+        tree = ExpressionTree("x / y")
+
+        def divide():
+            with self.assertRaises(ZeroDivisionError):
+                tree.evaluate_batch({'x': [1.0, 2.0], 'y': [1.0, 0.0]})
+            with self.assertRaises(ZeroDivisionError):
+                ExpressionTree("x ** -1").evaluate_batch({'x': [0.0]})
+        self._both_paths(divide)
+
+    def test_negative_base_with_fractional_exponent(self):
+        tree = ExpressionTree("x ** y")
+        for mode in ('closure', 'source', 'postfix'):
+            with self.assertRaises(ValueError):
+                tree.compile(mode)({'x': -4.0, 'y': 0.5})
+        with self.assertRaises(ValueError):
+            tree.evaluate({'x': -4.0, 'y': 0.5})
+
+        def power():
+            with self.assertRaises(ValueError):
+                tree.evaluate_batch({'x': [4.0, -4.0], 'y': [0.5, 0.5]})
+            return list(tree.evaluate_batch({'x': [-2.0, 4.0], 'y': [3.0, 0.5]}))
+        self.assertEqual(self._both_paths(power), [[-8.0, 2.0]] * 2)
+
+    def test_returns_new_column(self):
+        optimized, _ = ExpressionTree("x * 1").optimize()
+        for tree in (ExpressionTree("x"), optimized):
+            column = main.numpy.array([1.0, 2.0]) if main.numpy is not None else array('d', [1.0, 2.0])
+            result = tree.evaluate_batch({'x': column})
+            self.assertIsNot(result, column)
+            result[0] = 5.0
+            self.assertEqual(column[0], 1.0)
+
+
+class TestCompile(TestCase):
+
+    EXPRESSIONS = ("x", "2 + 3", "x * y - x / 2 + y ** 2", "-(x - y) * (x - y)", "")
+
+    def test_modes_match_evaluate(self):
+        variables = {'x': 3.0, 'y': 0.5}
+        for expr in self.EXPRESSIONS:
+            tree = ExpressionTree(expr)
+            optimized, _ = tree.optimize()
+            for mode in ('closure', 'source', 'postfix'):
+                self.assertEqual(tree.compile(mode)(variables), tree.evaluate(variables), msg=(expr, mode))
+                self.assertEqual(optimized.compile(mode)(variables), tree.evaluate(variables), msg=(expr, mode))
+
+    def test_missing_variables(self):
+        tree = ExpressionTree("x * y")
+        for mode in ('closure', 'source', 'postfix'):
+            function = tree.compile(mode)
+            with self.assertRaisesRegex(KeyError, "no value given for variable 'x'"):
+                function()
+            with self.assertRaisesRegex(KeyError, "no value given for variable 'y'"):
+                function({'x': 1.0})
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ExpressionTree("1").compile('jit')
+
+
+class TestParseCache(TestCase):
+
+    def setUp(self):
+        self.cache = ParseCache(maxsize=2)
+
+    def test_hits_and_misses(self):
+        first = self.cache.lookup("1 + x", ExpressionTree.parse)
+        self.assertIs(self.cache.lookup("1+\tx ", ExpressionTree.parse), first)  # same tokens
+        self.cache.lookup("", ExpressionTree.parse)
+        self.cache.lookup("   ", ExpressionTree.parse)  # a cached empty parse is still a hit
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+
+    def test_eviction(self):
+        for expr in ("1", "2", "1", "3"):
+            self.cache.lookup(expr, ExpressionTree.parse)
+        self.assertEqual(len(self.cache), 2)
+        self.cache.lookup("1", ExpressionTree.parse)  # recently used, so kept
+        self.cache.lookup("2", ExpressionTree.parse)  # least recently used, so evicted
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 4))
+        self.cache.clear()
+        self.assertEqual((len(self.cache), self.cache.hits, self.cache.misses), (0, 0, 0))
+
+    def test_warm(self):
+        handle, path = tempfile.mkstemp(suffix='.txt')
+        try:
+            with os.fdopen(handle, 'w') as file:
+                file.write("# comment\nx + 1\n\n  2 * y\n")
+            self.assertEqual(self.cache.warm(path), 2)
+            self.assertEqual(self.cache.misses, 2)
+            self.cache.lookup("2 * y", ExpressionTree.parse)
+            self.assertEqual(self.cache.hits, 1)
+        finally:
+            os.remove(path)
+
+    def test_trees_share_parses(self):
+        PARSE_CACHE.clear()
+        ExpressionTree("4 * z")
+        ExpressionTree("4*z")  # same tokens, so the same entry
+        ExpressionTree("4 ** z")
+        self.assertEqual((PARSE_CACHE.hits, PARSE_CACHE.misses), (1, 2))
+        with self.assertRaises(ValueError):
+            ExpressionTree("4 $ z")
+        self.assertEqual((len(PARSE_CACHE), PARSE_CACHE.misses), (2, 2))
+
+
+class TestOptimize(TestCase):
+
+    def test_folding(self):
+        tree, report = ExpressionTree("2 * 3 + x").optimize()
+        self.assertEqual(tree.postfix(), ['6.0', 'x', '+'])
+        self.assertEqual(report.folded, 1)
+        self.assertEqual((report.nodes_before, report.nodes_after), (5, 3))
+
+    def test_identities(self):
+        tree, report = ExpressionTree("(x * 1 + 0) / 1").optimize()
+        self.assertEqual(tree.postfix(), ['x'])
+        self.assertEqual(report.simplified, 3)
+        tree, report = ExpressionTree("x * 0").optimize()  # not 0 when x is inf or nan
+        self.assertEqual(tree.postfix(), ['x', '0', '*'])
+        self.assertEqual(report.simplified, 0)
+
+    def test_no_folding_of_errors(self):
+        tree, report = ExpressionTree("1 / 0").optimize()
+        self.assertEqual(report.folded, 0)
+        with self.assertRaises(ZeroDivisionError):
+            tree.evaluate()
+
+    def test_shared_subtrees(self):
+        tree, report = ExpressionTree("(x + y) * (x + y)").optimize()
+        self.assertEqual((report.nodes_before, report.nodes_after), (7, 7))
+        self.assertEqual((report.unique_nodes_before, report.unique_nodes_after), (7, 4))
+        self.assertAlmostEqual(report.reduction, 3 / 7)
+        self.assertEqual(tree.evaluate({'x': 1, 'y': 2}), 9)